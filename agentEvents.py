@@ -0,0 +1,186 @@
+# agentEvents.py
+"""Live events from an agent run via LangChain callbacks.
+
+A handler stored in a context variable is attached (through LangChain's configure
+hook) to every LLM and tool call made while that variable is set, so events can be
+collected from ``MCPAgent.run`` without changing how the agent is constructed.
+Each concurrent run sees only its own handler because asyncio tasks copy the context.
+
+``MetricsCallback`` rides on the same hook for every run and records spans for agent
+steps, LLM calls and tool calls (see ``metrics.py``).
+"""
+import asyncio
+from contextvars import ContextVar
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+import metrics
+
+_current_collector: ContextVar = ContextVar("agent_event_collector", default=None)
+register_configure_hook(_current_collector, inheritable=True)
+
+# Model runs tagged with this emit no events: calls whose reply may be discarded (see llmRouter.py)
+QUIET_TAG = "agent_events:quiet"
+
+
+def _quiet(tags) -> bool:
+    return QUIET_TAG in (tags or ())
+
+
+class EventCollector(AsyncCallbackHandler, _StreamingCallbackHandler):
+    """Turns LLM and tool callbacks into plain dict events on a queue.
+
+    Chat models only call their streaming API (and so emit ``token`` events) when a
+    streaming handler is attached; the ``_StreamingCallbackHandler`` base marks this
+    one as such, and its tap methods pass the output through unchanged.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    def emit(self, type_: str, **data):
+        self.queue.put_nowait({"type": type_, **data})
+
+    def tap_output_aiter(self, run_id, output):
+        return output
+
+    def tap_output_iter(self, run_id, output):
+        return output
+
+    async def on_chat_model_start(self, serialized, messages, *, tags=None, **kwargs):
+        if not _quiet(tags):
+            self.emit("llm_start")
+
+    async def on_llm_new_token(self, token, *, tags=None, **kwargs):
+        if token and not _quiet(tags):
+            self.emit("token", text=token)
+
+    async def on_llm_end(self, response, *, tags=None, **kwargs):
+        if not _quiet(tags):
+            self.emit("llm_end")
+
+    async def on_tool_start(self, serialized, input_str, **kwargs):
+        self.emit("tool_start", tool=(serialized or {}).get("name") or kwargs.get("name"), input=input_str[:500])
+
+    async def on_tool_end(self, output, **kwargs):
+        self.emit("tool_end", tool=kwargs.get("name"), output_chars=len(str(output)))
+
+    async def on_tool_error(self, error, **kwargs):
+        self.emit("tool_error", tool=kwargs.get("name"), error=str(error))
+
+
+class MetricsCallback(AsyncCallbackHandler):
+    """Times agent steps, LLM calls and tool calls as spans.
+
+    mcp_use drives the agent one step at a time without a parent run, so each
+    top-level chain run is one planning step. Spans are keyed by LangChain run id and
+    nest under the span that was current when the run started (e.g. ``agent_run``).
+    A cancelled run (client disconnect, losing hedge) gets no end callback, so spans
+    still open when the task that started them finishes are ended then.
+    """
+
+    run_inline = True  # run in the caller's task, not a task of its own, so current_task() is the run's
+
+    def __init__(self):
+        self.spans = {}  # run id -> (span, task that started it)
+        self._open = {}  # task -> run ids it started that have not ended
+
+    def _start(self, run_id, parent_run_id, kind: str, name: str):
+        parent = self.spans.get(parent_run_id)
+        task = asyncio.current_task()
+        self.spans[run_id] = (metrics.Span(kind, name, parent=parent[0] if parent else None), task)
+        if task is not None:
+            if task not in self._open:
+                self._open[task] = set()
+                task.add_done_callback(self._task_done)
+            self._open[task].add(run_id)
+
+    def _end(self, run_id, error=None):
+        span, task = self.spans.pop(run_id, (None, None))
+        if span is not None:
+            self._open.get(task, set()).discard(run_id)
+            span.end(error)
+
+    def _task_done(self, task: asyncio.Task):
+        error = asyncio.CancelledError() if task.cancelled() else task.exception()
+        for run_id in self._open.pop(task, ()):
+            self._end(run_id, error)
+
+    async def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._start(run_id, None, "agent_step", "plan")
+
+    async def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    async def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        name = params.get("model") or params.get("model_name") or params.get("_type") or "llm"
+        self._start(run_id, parent_run_id, "llm", str(name))
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    async def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "tool", (serialized or {}).get("name") or kwargs.get("name") or "tool")
+
+    async def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    async def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+def progress(message: str):
+    """Emit a ``progress`` event to the current run's collector, if any (e.g. from blogPipeline.py)."""
+    collector = _current_collector.get()
+    if collector is not None:
+        collector.emit("progress", message=message)
+
+
+_metrics_callback: ContextVar = ContextVar("agent_metrics_callback", default=MetricsCallback())
+register_configure_hook(_metrics_callback, inheritable=True)
+
+
+async def stream_run(coro_factory, keepalive: float = 15.0):
+    """Run ``coro_factory()`` as a task and yield its events, then a final ``result`` or ``error`` event.
+
+    A ``ping`` event is yielded after ``keepalive`` idle seconds. If the consumer stops
+    iterating (e.g. the HTTP client disconnected) the run is cancelled.
+    """
+    collector = EventCollector()
+    token = _current_collector.set(collector)
+    try:
+        task = asyncio.create_task(coro_factory())
+    finally:
+        _current_collector.reset(token)
+    try:
+        while True:
+            getter = asyncio.ensure_future(collector.queue.get())
+            done, _ = await asyncio.wait({getter, task}, timeout=keepalive, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            if task in done:
+                break
+            yield {"type": "ping"}
+        while not collector.queue.empty():
+            yield collector.queue.get_nowait()
+        if task.cancelled():
+            yield {"type": "error", "error": "Run was cancelled"}
+        elif task.exception() is not None:
+            yield {"type": "error", "error": str(task.exception())}
+        else:
+            yield {"type": "result", "response": task.result()}
+    finally:
+        if not task.done():
+            task.cancel()
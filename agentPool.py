@@ -0,0 +1,149 @@
+# agentPool.py
+"""Pool of per-session MCP agents sharing one MCP client.
+
+Each chat session gets its own ``MCPAgent`` (and so its own conversation memory),
+created on demand over the same ``MCPClient`` sessions. A semaphore caps how many
+agent runs execute at once, and idle sessions are evicted least-recently-used first
+when they exceed the idle timeout, the session cap or the memory budget.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable
+
+from mcp_use import MCPAgent, MCPClient
+
+import metrics
+from memoryManager import BoundedMemory
+
+# --- CONFIG ---
+MAX_SESSIONS = int(os.getenv("AGENT_POOL_MAX_SESSIONS", "100"))
+MAX_CONCURRENCY = int(os.getenv("AGENT_POOL_MAX_CONCURRENCY", "8"))
+IDLE_SECONDS = float(os.getenv("AGENT_POOL_IDLE_SECONDS", "1800"))
+MEMORY_BUDGET_BYTES = int(float(os.getenv("AGENT_POOL_MEMORY_BUDGET_MB", "256")) * 1024 * 1024)
+
+
+@dataclass
+class PooledAgent:
+    agent: MCPAgent
+    memory: BoundedMemory
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    cleared: bool = False  # forgotten while a run held the lock; dropped when the run ends
+
+    def memory_bytes(self) -> int:
+        """Rough size of the conversation history held by this agent."""
+        return sum(len(str(message.content)) for message in self.agent.get_conversation_history())
+
+
+class AgentPool:
+    def __init__(
+        self,
+        client: MCPClient,
+        make_agent: Callable[[MCPClient], MCPAgent],
+        max_sessions: int = MAX_SESSIONS,
+        max_concurrency: int = MAX_CONCURRENCY,
+        idle_seconds: float = IDLE_SECONDS,
+        memory_budget_bytes: int = MEMORY_BUDGET_BYTES,
+    ):
+        self.client = client
+        self.make_agent = make_agent
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._agents: OrderedDict[str, PooledAgent] = OrderedDict()
+        self.evictions = 0
+
+    async def start(self):
+        """Open the shared MCP sessions once so every pooled agent reuses them."""
+        if not self.client.get_all_active_sessions():
+            await self.client.create_all_sessions()
+
+    def get(self, session_id: str) -> PooledAgent:
+        pooled = self._agents.get(session_id)
+        if pooled is None:
+            agent = self.make_agent(self.client)
+            # Initialize lazily on first run without handing the agent ownership of the shared sessions
+            agent.auto_initialize = True
+            pooled = self._agents[session_id] = PooledAgent(agent, BoundedMemory(agent))
+        self._agents.move_to_end(session_id)
+        pooled.last_used = time.monotonic()
+        return pooled
+
+    async def run(self, session_id: str, query: str) -> str:
+        """Run ``query`` on the session's agent; runs within one session are serialized."""
+        async with self._slots:
+            while True:
+                pooled = self.get(session_id)
+                async with pooled.lock:
+                    if self._agents.get(session_id) is not pooled:
+                        continue  # the session was cleared while we waited; start on a fresh agent
+                    try:
+                        with metrics.span("agent_run", "chat"):
+                            return await pooled.memory.run(query, manage_connector=False)
+                    finally:
+                        pooled.last_used = time.monotonic()
+                        if pooled.cleared:
+                            self._agents.pop(session_id, None)
+                        self.evict()
+
+    def slot(self) -> asyncio.Semaphore:
+        """The semaphore bounding concurrent runs, for other work that should count against it."""
+        return self._slots
+
+    def clear(self, session_id: str) -> bool:
+        """Forget a session and its conversation memory.
+
+        A session with a run in progress is dropped when that run ends, like ``evict()``
+        never drops a busy agent; runs already waiting on it then start on a fresh agent.
+        """
+        pooled = self._agents.get(session_id)
+        if pooled is None:
+            return False
+        if pooled.lock.locked():
+            pooled.cleared = True
+        else:
+            del self._agents[session_id]
+        return True
+
+    def evict(self):
+        """Drop idle sessions, then least-recently-used ones over the session cap or memory budget."""
+        now = time.monotonic()
+        for session_id, pooled in list(self._agents.items()):
+            if now - pooled.last_used > self.idle_seconds and not pooled.lock.locked():
+                self._drop(session_id)
+        total = sum(pooled.memory_bytes() for pooled in self._agents.values())
+        for session_id, pooled in list(self._agents.items()):
+            if len(self._agents) <= self.max_sessions and total <= self.memory_budget_bytes:
+                break
+            if pooled.lock.locked():
+                continue
+            total -= pooled.memory_bytes()
+            self._drop(session_id)
+
+    def _drop(self, session_id: str):
+        # Only the agent is discarded; the shared client sessions stay open
+        del self._agents[session_id]
+        self.evictions += 1
+
+    def session_stats(self, session_id: str) -> dict | None:
+        pooled = self._agents.get(session_id)
+        if pooled is None:
+            return None
+        return {
+            "turns": pooled.memory.turn,
+            "prompt_tokens": pooled.memory.prompt_sizes,
+            "memory_bytes": pooled.memory_bytes(),
+            "busy": pooled.lock.locked(),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._agents),
+            "busy": sum(pooled.lock.locked() for pooled in self._agents.values()),
+            "memory_bytes": sum(pooled.memory_bytes() for pooled in self._agents.values()),
+            "evictions": self.evictions,
+        }
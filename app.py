@@ -1,9 +1,9 @@
 import gradio as gr
 import asyncio
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from mcp_use import MCPAgent, MCPClient
 import os
+import time
+from contextlib import aclosing
 
 load_dotenv()
 os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
@@ -60,62 +60,137 @@ Your output must follow these guidelines:
 </html>
 """
 
-# Initialize MCP client and agent globally
-config_file = "newsCrawler.json"
-client = MCPClient.from_config_file(config_file)
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-04-17")
-agent = MCPAgent(
-    llm=llm,
-    client=client,
-    system_prompt=system_prompt,
-    max_steps=15,
-    memory_enabled=True,
-    verbose=True
-)
-
-# Store logs globally
-terminal_logs = []
-
-async def get_response(user_input):
-    """Async function to get agent's response."""
-    response = await agent.run(user_input)
-    return response
-
-def handle_input(user_input, chat_history):
-    """Handles user input from sidebar textbox."""
-    if user_input.strip().lower() in ["exit", "quit"]:
-        terminal_logs.append("Session ended by user.")
-        return chat_history + [("You: " + user_input, "Session ended.")], "", "\n".join(terminal_logs)
-
-    if user_input.strip().lower() == "clear":
-        agent.clear_conversation_history()
-        terminal_logs.append("Conversation history cleared.")
-        return [], "", "\n".join(terminal_logs)
-
-    terminal_logs.append(f"Running agent for input: {user_input}")
-
-    # Handle asyncio event loop safely
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # Inside running loop (e.g., Jupyter, Gradio async backend)
-            response = asyncio.ensure_future(get_response(user_input))
-            response = loop.run_until_complete(response)
-        else:
-            # Normal script
-            response = loop.run_until_complete(get_response(user_input))
-    except RuntimeError:
-        # No loop exists yet
-        response = asyncio.run(get_response(user_input))
-    except Exception as e:
-        response = f"Error: {str(e)}"
-        terminal_logs.append(response)
-        return chat_history + [("You: " + user_input, "Assistant: Error")], "", "\n".join(terminal_logs[-20:])
+config_file = os.getenv("MCP_CONFIG", "newsCrawler.json")
+
+# --- CONFIG ---
+CONCURRENCY_LIMIT = int(os.getenv("APP_CONCURRENCY_LIMIT", "4"))  # generations at once; later ones wait in the queue
+PREVIEW_INTERVAL = float(os.getenv("APP_PREVIEW_INTERVAL", "0.3"))  # seconds between blog preview refreshes
+LOG_LINES = 20
+
+pool = None
+_pool_lock = asyncio.Lock()
+
 
-    terminal_logs.append("Agent responded successfully.")
+async def get_pool():
+    """MCP client, LLM and agent pool, created on the first prompt so the UI comes up without waiting for them.
 
-    chat_history.append(("You: " + user_input, "Assistant: [Response generated]"))
-    return chat_history, response, "\n".join(terminal_logs[-20:])  # show last 20 logs
+    Every browser session gets its own agent (and conversation memory) from the pool,
+    all sharing the client's MCP sessions.
+    """
+    global pool
+    async with _pool_lock:
+        if pool is None:
+            # Heavy imports (LangChain, model SDKs, mcp_use) are deferred along with the objects
+            from mcp_use import MCPAgent, MCPClient
+            from agentPool import AgentPool
+            import llmRouter
+
+            client = MCPClient.from_config_file(config_file)
+            llm = llmRouter.make_router()
+
+            def make_agent(client):
+                return MCPAgent(
+                    llm=llm,
+                    client=client,
+                    system_prompt=system_prompt,
+                    max_steps=15,
+                    memory_enabled=True,
+                    verbose=True
+                )
+
+            new_pool = AgentPool(client, make_agent)
+            await new_pool.start()
+            pool = new_pool
+    return pool
+
+
+def preview_html(text):
+    """Renderable HTML from a partial model answer: code fences stripped, unclosed tags left to the browser."""
+    start = text.find("<")
+    return text[start:].split("```")[0] if start >= 0 else ""
+
+
+def describe_event(event):
+    """Terminal log line for an agent event, or None for events that are not logged."""
+    if event["type"] == "tool_start":
+        return f"Calling {event['tool']}: {event['input'][:200]}"
+    if event["type"] == "tool_end":
+        return f"{event['tool']} returned {event['output_chars']} chars"
+    if event["type"] == "tool_error":
+        return f"{event['tool']} failed: {event['error']}"
+    if event["type"] == "error":
+        return f"Error: {event['error']}"
+    if event["type"] == "result":
+        return "Agent responded successfully."
+    return None
+
+
+async def handle_input(user_input, chat_history, logs, request: gr.Request):
+    """Run the prompt on this browser session's agent, streaming the log and blog preview as it works."""
+    chat_history = list(chat_history or [])
+    logs = list(logs or [])
+    session_id = request.session_hash or "default"
+    command = user_input.strip().lower()
+    if command in ["exit", "quit"]:
+        logs.append("Session ended by user.")
+        yield chat_history + [("You: " + user_input, "Session ended.")], gr.update(), "\n".join(logs[-LOG_LINES:]), logs
+        return
+
+    if command == "clear":
+        if pool is not None:
+            pool.clear(session_id)
+        logs.append("Conversation history cleared.")
+        yield [], "", "\n".join(logs[-LOG_LINES:]), logs
+        return
+
+    from agentEvents import stream_run
+
+    logs.append(f"Running agent for input: {user_input}")
+    chat_history.append(("You: " + user_input, "Assistant: [Generating...]"))
+    yield chat_history, gr.update(), "\n".join(logs[-LOG_LINES:]), logs
+
+    try:
+        agents = await get_pool()
+    except Exception as e:
+        logs.append(f"Error: {str(e)}")
+        chat_history[-1] = ("You: " + user_input, "Assistant: Error")
+        yield chat_history, gr.update(), "\n".join(logs[-LOG_LINES:]), logs
+        return
+
+    answer, last_preview = "", 0.0
+    async with aclosing(stream_run(lambda: agents.run(session_id, user_input))) as stream:
+        async for event in stream:
+            if event["type"] == "llm_start":
+                answer = ""
+            elif event["type"] == "token":
+                # Only the final answer carries HTML; refresh the preview at most every PREVIEW_INTERVAL
+                answer += event["text"]
+                preview = preview_html(answer)
+                if preview and time.monotonic() - last_preview >= PREVIEW_INTERVAL:
+                    last_preview = time.monotonic()
+                    yield chat_history, preview, gr.update(), logs
+                continue
+
+            line = describe_event(event)
+            if line is None:
+                continue
+            logs.append(line)
+            html = gr.update()
+            if event["type"] == "result":
+                html = event["response"]
+                chat_history[-1] = ("You: " + user_input, "Assistant: [Response generated]")
+            elif event["type"] == "error":
+                chat_history[-1] = ("You: " + user_input, "Assistant: Error")
+            yield chat_history, html, "\n".join(logs[-LOG_LINES:]), logs
+
+
+async def forget_session(request: gr.Request):
+    """Drop a closed browser session's agent and conversation memory.
+
+    Async so Gradio runs it on the event loop that owns the pool, not a worker thread.
+    """
+    if pool is not None:
+        pool.clear(request.session_hash)
 
 # Gradio Blocks UI
 with gr.Blocks(title="AI Blog Writer with Sidebar") as app:
@@ -130,6 +205,7 @@ with gr.Blocks(title="AI Blog Writer with Sidebar") as app:
 
             user_input = gr.Textbox(placeholder="Type your prompt here...", label="💬 Enter prompt")
             send_button = gr.Button("Generate Blog")
+            logs_state = gr.State([])  # this browser session's terminal log
 
         # Main output area (right)
         with gr.Column(scale=3, elem_id="right-column"):
@@ -139,9 +215,11 @@ with gr.Blocks(title="AI Blog Writer with Sidebar") as app:
     # Button event
     send_button.click(
         fn=handle_input,
-        inputs=[user_input, chat_view],
-        outputs=[chat_view, html_output, terminal_output]
+        inputs=[user_input, chat_view, logs_state],
+        outputs=[chat_view, html_output, terminal_output, logs_state],
+        concurrency_limit=CONCURRENCY_LIMIT,
     )
+    app.unload(forget_session)
 
     # Apply custom CSS styling
     app.css = """
@@ -198,4 +276,5 @@ with gr.Blocks(title="AI Blog Writer with Sidebar") as app:
         }
     """
 
-app.launch()
+if __name__ == "__main__":
+    app.queue(default_concurrency_limit=CONCURRENCY_LIMIT).launch()
@@ -0,0 +1,47 @@
+# backgroundLoop.py
+"""A long-lived asyncio event loop on its own thread, for synchronous front ends.
+
+Streamlit runs each script rerun on a worker thread without a running loop, so
+async agent calls used to be driven with ``nest_asyncio`` and ``run_until_complete``
+on whatever loop that thread had. MCP sessions and agents are bound to the loop they
+were created on, so they could not outlive a request. ``BackgroundLoop`` keeps one
+loop running for the life of the process; callers submit coroutines to it from any
+thread and block on the result, and everything created there stays usable.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine
+
+
+class BackgroundLoop:
+    def __init__(self, name: str = "agent-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule ``coro`` on the loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: float | None = None) -> Any:
+        """Run ``coro`` on the loop and block the calling thread until it finishes."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self, timeout: float = 5):
+        """Stop the loop once pending callbacks have run (coroutines still running are abandoned)."""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -0,0 +1,116 @@
+# bench_daemon.py
+"""Client startup and per-request latency: spawning mcpServer.py per client vs the shared daemon.
+
+Runs offline against the fixture site and fake Exa from ``benchmarks/fakes.py``. Each
+sample is a fresh stdio client, as a front end starting up would be, that initializes
+a session, runs one search for a topic every client shares and scrapes one page every
+client shares. In ``spawn`` mode the client launches ``mcpServer.py`` itself; in
+``daemon`` mode it launches ``mcpDaemon.py attach`` against one daemon (whose own cold
+start is reported separately), so only the first client pays for the search and
+scrape and later ones are served from the daemon's warm caches.
+
+    python -m benchmarks.bench_daemon [--clients 5] [--site-latency 0.2] [--exa-latency 0.3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import uvicorn
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.bench_e2e import ROOT, git_revision, summarize
+from benchmarks.fakes import fake_exa, fixture_site, load_pages
+from benchmarks.load_sse import free_port, wait_for_port
+
+
+async def client_run(command: list[str], env: dict, site_url: str) -> dict:
+    """One client lifetime: spawn, initialize, search, scrape. Returns seconds per phase."""
+    params = StdioServerParameters(command=command[0], args=command[1:], env=env, cwd=str(ROOT))
+    phases = {}
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            phases["ready"] = time.perf_counter() - start
+            mark = time.perf_counter()
+            await session.call_tool("exa_search_tool", {"topic": "shared daemon benchmark topic"})
+            phases["exa_search"] = time.perf_counter() - mark
+            mark = time.perf_counter()
+            await session.call_tool("webpage_scraper", {"url": f"{site_url}/articles/daemon-benchmark"})
+            phases["webpage_scraper"] = time.perf_counter() - mark
+    phases["total"] = time.perf_counter() - start
+    return phases
+
+
+async def bench_mode(command: list[str], env: dict, site_url: str, clients: int) -> dict:
+    samples = {}
+    for _ in range(clients):
+        for phase, seconds in (await client_run(command, env, site_url)).items():
+            samples.setdefault(phase, []).append(seconds)
+    return {phase: summarize(values) for phase, values in samples.items()}
+
+
+async def main(args):
+    tmp = Path(tempfile.mkdtemp(prefix="bench_daemon_"))
+    site_port, exa_port = free_port(), free_port()
+    site_url, exa_url = f"http://127.0.0.1:{site_port}", f"http://127.0.0.1:{exa_port}"
+    servers = [
+        uvicorn.Server(uvicorn.Config(fixture_site(load_pages(args.fixtures), args.site_latency),
+                                      port=site_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(fake_exa(site_url, args.exa_latency), port=exa_port, log_level="warning")),
+    ]
+    tasks = [asyncio.create_task(server.serve()) for server in servers]
+    env = {
+        **os.environ,
+        "EXA_API_KEY": "offline",
+        "EXA_BASE_URL": exa_url,
+        "RETRIEVAL_ENABLED": "0",
+        "PREFETCH_ENABLED": "0",
+        "PAGE_CACHE_PATH": str(tmp / "pages.sqlite3"),
+        "DEDUP_INDEX_PATH": str(tmp / "fingerprints.sqlite3"),
+        "MCP_DAEMON_SOCKET": "" if os.name == "nt" else str(tmp / "mcp-daemon.sock"),
+        "MCP_DAEMON_PORT": str(free_port()),
+        "MCP_DAEMON_IDLE_SECONDS": "0",
+    }
+    report = {"meta": {"revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                       "params": vars(args)}}
+    daemon = None
+    try:
+        await wait_for_port(site_port)
+        await wait_for_port(exa_port)
+        report["spawn"] = await bench_mode([sys.executable, str(ROOT / "mcpServer.py")], env, site_url,
+                                           args.clients)
+        # Separate caches so the daemon starts as cold as each spawned server did
+        env.update({"PAGE_CACHE_PATH": str(tmp / "daemon-pages.sqlite3"),
+                    "DEDUP_INDEX_PATH": str(tmp / "daemon-fingerprints.sqlite3")})
+        start = time.perf_counter()
+        daemon = subprocess.Popen([sys.executable, str(ROOT / "mcpDaemon.py"), "serve"], cwd=ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        attach = [sys.executable, str(ROOT / "mcpDaemon.py"), "attach"]
+        await asyncio.wait_for(client_run(attach, env, site_url), timeout=120)  # waits for the socket
+        report["daemon_cold_start_seconds"] = round(time.perf_counter() - start, 3)
+        report["daemon"] = await bench_mode(attach, env, site_url, args.clients)
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait(timeout=10)
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*tasks)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=str(ROOT / "results"), help="directory of recorded *.html pages")
+    parser.add_argument("--clients", type=int, default=5, help="client lifetimes per mode")
+    parser.add_argument("--site-latency", type=float, default=0.2)
+    parser.add_argument("--exa-latency", type=float, default=0.3)
+    asyncio.run(main(parser.parse_args()))
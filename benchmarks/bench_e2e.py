@@ -0,0 +1,245 @@
+# bench_e2e.py
+"""Offline end-to-end benchmark for the blog pipeline.
+
+Everything runs locally: a fixture site serves recorded HTML with configurable latency,
+a fake Exa endpoint returns results pointing at it, and a scripted chat model replays
+a search → scrape → write tool-call sequence (see ``benchmarks/fakes.py``). Against
+those it measures
+
+- ``tools``: per-tool latency through the SSE MCP server (mcpServerDocker/server.py), cold and warm
+- ``blog``: end-to-end time for one blog post from an MCPAgent attached to that server
+- ``chat``: ``/chat`` throughput and latency of fastAPI.py under 1..N concurrent clients
+
+and writes one JSON document, so runs from different commits can be diffed.
+
+    python -m benchmarks.bench_e2e [--output bench.json] [--concurrency 1 4 8] [--site-latency 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from benchmarks.fakes import ScriptedChatModel, fake_exa, fixture_site, load_pages, load_script
+from benchmarks.load_sse import free_port, wait_for_port
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"n": 0}
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:  # uvicorn waits on lingering SSE streams
+        process.kill()
+
+
+async def timed(samples: list[float], coro):
+    start = time.perf_counter()
+    result = await coro
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+async def bench_tools(server_url: str, site_url: str, repeats: int) -> dict:
+    names = ["exa_search_cold", "exa_search_warm", "webpage_scraper_cold", "webpage_scraper_warm",
+             "webpage_scraper_batch_5"]
+    samples = {name: [] for name in names}
+    run = uuid.uuid4().hex[:6]
+    async with sse_client(server_url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for i in range(repeats):
+                topic = f"tools {run} {i}"
+                await timed(samples["exa_search_cold"], session.call_tool("exa_search_tool", {"topic": topic}))
+                await timed(samples["exa_search_warm"], session.call_tool("exa_search_tool", {"topic": topic}))
+                url = f"{site_url}/articles/tools-{run}-{i}"
+                await timed(samples["webpage_scraper_cold"], session.call_tool("webpage_scraper", {"url": url}))
+                await timed(samples["webpage_scraper_warm"], session.call_tool("webpage_scraper", {"url": url}))
+                urls = [f"{site_url}/articles/batch-{run}-{i}-{j}" for j in range(5)]
+                await timed(samples["webpage_scraper_batch_5"],
+                            session.call_tool("webpage_scraper_batch", {"urls": urls}))
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+async def bench_blog(mcp_config: dict, script: list[dict], llm_latency: float, repeats: int) -> dict:
+    from mcp_use import MCPAgent, MCPClient
+
+    client = MCPClient.from_dict(mcp_config)
+    llm = ScriptedChatModel(script=script, latency=llm_latency)
+    agent = MCPAgent(llm=llm, client=client, max_steps=15, memory_enabled=False)
+    samples, sizes = [], []
+    try:
+        await agent.initialize()
+        for i in range(repeats):
+            result = await timed(samples, agent.run(f"blog {uuid.uuid4().hex[:6]} box office week {i}",
+                                                    manage_connector=False))
+            sizes.append(len(result))
+    finally:
+        await client.close_all_sessions()
+    return {**summarize(samples), "llm_calls": llm.calls, "html_chars_mean": int(statistics.fmean(sizes))}
+
+
+async def chat_client(base_url: str, client_id: int, requests: int, run: str) -> tuple[list[float], int]:
+    latencies, errors = [], 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as http:
+        for i in range(requests):
+            start = time.perf_counter()
+            response = await http.post("/chat", json={
+                "message": f"chat {run} client {client_id} post {i}",
+                "session_id": f"{run}-{client_id}",
+            })
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+    return latencies, errors
+
+
+async def bench_chat(base_url: str, concurrency: list[int], requests: int) -> list[dict]:
+    results = []
+    for clients in concurrency:
+        run = uuid.uuid4().hex[:6]
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(chat_client(base_url, c, requests, run) for c in range(clients)))
+        elapsed = time.perf_counter() - start
+        latencies = [l for ls, _ in outcomes for l in ls]
+        results.append({
+            "clients": clients,
+            "requests": len(latencies),
+            "errors": sum(e for _, e in outcomes),
+            "seconds": round(elapsed, 3),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            **summarize(latencies),
+        })
+    return results
+
+
+def serve_chat(args):
+    """Run fastAPI.py with the scripted model in place of Gemini (invoked as a subprocess)."""
+    sys.path.insert(0, str(ROOT))
+    import fastAPI
+
+    script = load_script(args.script)
+    fastAPI.make_llm = lambda **kwargs: ScriptedChatModel(script=script, latency=args.llm_latency)
+    uvicorn.run(fastAPI.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+async def main(args):
+    tmp = Path(tempfile.mkdtemp(prefix="bench_e2e_"))
+    site_port, exa_port, mcp_port, chat_port = free_port(), free_port(), free_port(), free_port()
+    site_url, exa_url = f"http://127.0.0.1:{site_port}", f"http://127.0.0.1:{exa_port}"
+
+    pages = load_pages(args.fixtures)
+    servers = [
+        uvicorn.Server(uvicorn.Config(fixture_site(pages, args.site_latency, args.site_jitter),
+                                      port=site_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(fake_exa(site_url, args.exa_latency), port=exa_port, log_level="warning")),
+    ]
+    tasks = [asyncio.create_task(server.serve()) for server in servers]
+
+    env = {
+        **os.environ,
+        "EXA_API_KEY": "offline",
+        "EXA_BASE_URL": exa_url,
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "offline"),
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(mcp_port),
+        "PAGE_CACHE_PATH": str(tmp / "pages.sqlite3"),
+        "DEDUP_INDEX_PATH": str(tmp / "fingerprints.sqlite3"),
+        "RETRIEVAL_ENABLED": "0",
+        "BLOG_CACHE_ENABLED": "0",  # measure the agent path, not cached answers
+        # Every fixture page lives on one local host; lift the per-host cap so it does not serialize clients
+        "FETCH_MAX_PER_HOST": str(max(16, max(args.concurrency) * 3)),
+    }
+    mcp_url = f"http://127.0.0.1:{mcp_port}/sse"
+    mcp_config = {"mcpServers": {"web": {"url": mcp_url}}}
+    config_path = tmp / "mcp.json"
+    config_path.write_text(json.dumps(mcp_config))
+
+    mcp_server = subprocess.Popen([sys.executable, "-m", "mcpServerDocker.server"], cwd=ROOT,
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    chat_cmd = [sys.executable, "-m", "benchmarks.bench_e2e", "--serve-chat", "--port", str(chat_port),
+                "--llm-latency", str(args.llm_latency)] + (["--script", args.script] if args.script else [])
+    chat_server = subprocess.Popen(chat_cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   env={**env, "MCP_CONFIG": str(config_path),
+                                        "JOB_DB_PATH": str(tmp / "jobs.sqlite3"),
+                                        "JOB_RESULTS_DIR": str(tmp / "results")})
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("serve_chat", "port")},
+        },
+    }
+    try:
+        await wait_for_port(site_port)
+        await wait_for_port(exa_port)
+        await wait_for_port(mcp_port)
+        report["tools"] = await bench_tools(mcp_url, site_url, args.repeats)
+        report["blog"] = await bench_blog(mcp_config, load_script(args.script), args.llm_latency, args.repeats)
+        await wait_for_port(chat_port, timeout=60)
+        report["chat"] = await bench_chat(f"http://127.0.0.1:{chat_port}", args.concurrency, args.chat_requests)
+    finally:
+        stop(chat_server)
+        stop(mcp_server)
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*tasks)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--fixtures", default=str(ROOT / "results"), help="directory of recorded *.html pages")
+    parser.add_argument("--site-latency", type=float, default=0.2, help="seconds each fixture page takes")
+    parser.add_argument("--site-jitter", type=float, default=0.05)
+    parser.add_argument("--exa-latency", type=float, default=0.3, help="seconds each fake Exa search takes")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per scripted model call")
+    parser.add_argument("--script", help="JSON tool-call script for the fake model (default: search, scrape, write)")
+    parser.add_argument("--repeats", type=int, default=5, help="samples per tool and blog measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--chat-requests", type=int, default=3, help="sequential /chat requests per client")
+    parser.add_argument("--serve-chat", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    serve_chat(args) if args.serve_chat else asyncio.run(main(args))
@@ -0,0 +1,123 @@
+# bench_extract.py
+"""Benchmark paragraph extraction: full BeautifulSoup parse vs the streaming extractor.
+
+Each engine runs in its own subprocess so peak RSS is measured in isolation.
+
+    python -m benchmarks.bench_extract [--corpus results] [--repeat 20] [--no-synthetic]
+
+Prints a table and a JSON summary with throughput (MB/s) and peak RSS per engine.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ENGINES = ["bs4", "stream", "stream-unbounded"]
+
+
+def synthetic_page(paragraphs: int = 4000) -> bytes:
+    """A large news-style page: navigation and script boilerplate around many paragraphs."""
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(300))
+    script = "<script>" + "var tracking = {'id': 1, 'events': []};" * 500 + "</script>"
+    body = "".join(
+        f"<div class='para'><p>Paragraph {i} of the story with <a href='/x/{i}'>a link</a> "
+        f"and some &amp; entities &mdash; {'lorem ipsum dolor sit amet ' * 8}</p></div>"
+        for i in range(paragraphs)
+    )
+    return f"<html><head>{script}</head><body><ul>{nav}</ul><article>{body}</article></body></html>".encode()
+
+
+def load_corpus(corpus: str, synthetic: bool) -> list[bytes]:
+    pages = [path.read_bytes() for path in sorted(Path(corpus).glob("*.htm*"))]
+    if synthetic:
+        pages.append(synthetic_page())
+    return pages
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_engine(engine: str, pages: list[bytes], repeat: int) -> dict:
+    if engine == "bs4":
+        from bs4 import BeautifulSoup
+
+        def extract(content):
+            soup = BeautifulSoup(content, "html.parser")
+            return "\n".join(p.text for p in soup.find_all('p'))
+    else:
+        import htmlExtract
+        max_chars = htmlExtract.MAX_CHARS if engine == "stream" else sys.maxsize
+        max_bytes = htmlExtract.MAX_BYTES if engine == "stream" else sys.maxsize
+
+        def extract(content):
+            return htmlExtract.extract_text(content, max_bytes=max_bytes, max_chars=max_chars)
+
+    rss_before = _peak_rss_mb()
+    chars = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in pages:
+            chars += len(extract(content))
+    elapsed = time.perf_counter() - start
+    rss_after = _peak_rss_mb()
+
+    # Separate pass: tracemalloc slows allocation-heavy code too much to time under it
+    tracemalloc.start()
+    for content in pages:
+        extract(content)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    megabytes = sum(len(p) for p in pages) * repeat / (1024 * 1024)
+    return {
+        "engine": engine,
+        "pages": len(pages) * repeat,
+        "input_mb": round(megabytes, 2),
+        "seconds": round(elapsed, 4),
+        "throughput_mb_s": round(megabytes / elapsed, 2),
+        "chars_out": chars // repeat,
+        "peak_rss_mb": round(rss_after, 1) if rss_after is not None else None,
+        "rss_growth_mb": round(rss_after - rss_before, 1) if rss_after is not None else None,
+        "traced_peak_mb": round(traced_peak / (1024 * 1024), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="results", help="directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-synthetic", action="store_true", help="do not add the generated large page")
+    parser.add_argument("--engine", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        pages = load_corpus(args.corpus, not args.no_synthetic)
+        print(json.dumps(run_engine(args.engine, pages, args.repeat)))
+        return
+
+    results = []
+    for engine in ENGINES:
+        cmd = [sys.executable, "-m", "benchmarks.bench_extract", "--engine", engine,
+               "--corpus", args.corpus, "--repeat", str(args.repeat)]
+        if args.no_synthetic:
+            cmd.append("--no-synthetic")
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'engine':<18}{'MB/s':>10}{'peak RSS MB':>14}{'RSS growth MB':>16}{'chars out':>12}")
+    for r in results:
+        print(f"{r['engine']:<18}{r['throughput_mb_s']:>10}{str(r['peak_rss_mb']):>14}"
+              f"{str(r['rss_growth_mb']):>16}{r['chars_out']:>12}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# bench_frontend.py
+"""Per-message overhead of the Streamlit front end: rebuilt per message vs cached.
+
+Streamlit reruns its script for every message. ``mcpServerDocker/client.py`` used to
+build the MCP client, LLM and agent at module level on every rerun and drive the run
+on a throwaway loop, so every message spawned and initialized a fresh MCP server.
+It now keeps them on a ``BackgroundLoop`` behind an ``AgentPool`` for the life of
+the process. Both paths are replayed here without Streamlit against a stdio
+``mcpServer.py``, with a scripted model that answers at once without tools, so the
+time measured is framework overhead only.
+
+    python -m benchmarks.bench_frontend [--messages 10]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.bench_e2e import ROOT, git_revision, summarize
+from benchmarks.fakes import ScriptedChatModel
+
+sys.path.insert(0, str(ROOT))
+
+from mcp_use import MCPAgent, MCPClient  # noqa: E402
+
+from agentPool import AgentPool  # noqa: E402
+from backgroundLoop import BackgroundLoop  # noqa: E402
+from memoryManager import BoundedMemory  # noqa: E402
+
+CONFIG = {"mcpServers": {"web": {"command": sys.executable, "args": [str(ROOT / "mcpServer.py")]}}}
+SCRIPT = [{"content": "<html><body><h1>{prompt}</h1></body></html>"}]
+
+
+def make_agent(client: MCPClient) -> MCPAgent:
+    return MCPAgent(llm=ScriptedChatModel(script=SCRIPT), client=client, max_steps=15, memory_enabled=True)
+
+
+def rebuilt_per_message(messages: int) -> list[float]:
+    """The old rerun path: new client, LLM and agent, a fresh loop, sessions closed afterwards."""
+    samples = []
+    for i in range(messages):
+        start = time.perf_counter()
+        client = MCPClient.from_dict(CONFIG)
+        memory = BoundedMemory(make_agent(client))
+
+        async def run():
+            try:
+                return await memory.run(f"message {i}")
+            finally:
+                await client.close_all_sessions()
+
+        asyncio.run(run())
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def cached_runtime(messages: int) -> tuple[float, list[float]]:
+    """The new path: one loop thread and pool; returns (setup seconds, per-message seconds)."""
+    start = time.perf_counter()
+    loop = BackgroundLoop()
+    client = MCPClient.from_dict(CONFIG)
+    pool = AgentPool(client, make_agent)
+    loop.run(pool.start())
+    setup = time.perf_counter() - start
+    samples = []
+    try:
+        for i in range(messages):
+            start = time.perf_counter()
+            loop.run(pool.run("browser-session", f"message {i}"))
+            samples.append(time.perf_counter() - start)
+    finally:
+        loop.run(client.close_all_sessions(), timeout=10)
+        loop.close()
+    return setup, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+    before = rebuilt_per_message(args.messages)
+    setup, after = cached_runtime(args.messages)
+    print(json.dumps({
+        "meta": {"revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                 "params": vars(args)},
+        "rebuilt_per_message": summarize(before),
+        "cached": {"setup_ms": round(setup * 1000, 1), **summarize(after)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# bench_pipeline.py
+"""Wall-clock time of the fan-out/fan-in pipeline (blogPipeline.py) vs the single agent.
+
+Runs offline against the same fixture site, fake Exa and SSE MCP server as
+``bench_e2e``, with ``ScriptedChatModel`` as the model. ``--char-latency`` charges
+decode time per character of each reply, so writing the whole post in one call costs
+what it would with a real model. Compared:
+
+- ``agent_sequential``: search, then scrape ``--sources`` pages one tool call at a time, then write
+- ``agent_batched``: search, one ``webpage_scraper_batch`` call, then write (the bench_e2e script)
+- ``pipeline_cN``: outline, ``--sections`` sections researched and drafted N at a time, merge
+
+Every sample uses a new prompt, so no run is served from the search or page caches.
+
+    python -m benchmarks.bench_pipeline [--repeats 5] [--sections 4] [--concurrency 1 2 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import uvicorn
+
+from benchmarks.bench_e2e import ROOT, git_revision, stop, summarize, timed
+from benchmarks.fakes import BLOG_SCRIPT, ScriptedChatModel, fake_exa, fixture_site, load_pages
+from benchmarks.load_sse import free_port, wait_for_port
+
+sys.path.insert(0, str(ROOT))
+
+
+def sequential_script(sources: int) -> list[dict]:
+    return ([{"tool_calls": [{"name": "exa_search_tool", "args": {"topic": "{prompt}", "num_results": sources}}]}]
+            + [{"tool_calls": [{"name": "webpage_scraper", "args": {"url": f"$url:{i}"}}]} for i in range(sources)]
+            + [{"content": "$blog"}])
+
+
+async def bench_agent(mcp_config: dict, script: list[dict], args) -> dict:
+    from mcp_use import MCPAgent, MCPClient
+
+    client = MCPClient.from_dict(mcp_config)
+    llm = ScriptedChatModel(script=script, latency=args.llm_latency, char_latency=args.char_latency)
+    agent = MCPAgent(llm=llm, client=client, max_steps=15, memory_enabled=False)
+    samples, sizes = [], []
+    try:
+        await agent.initialize()
+        for i in range(args.repeats):
+            result = await timed(samples, agent.run(f"agent {uuid.uuid4().hex[:6]} box office week {i}",
+                                                    manage_connector=False))
+            sizes.append(len(result))
+    finally:
+        await client.close_all_sessions()
+    return {**summarize(samples), "llm_calls": llm.calls // args.repeats,
+            "html_chars_mean": int(statistics.fmean(sizes))}
+
+
+async def bench_pipeline(mcp_config: dict, concurrency: int, args) -> dict:
+    from mcp_use import MCPClient
+
+    from blogPipeline import BlogPipeline
+
+    client = MCPClient.from_dict(mcp_config)
+    llm = ScriptedChatModel(latency=args.llm_latency, char_latency=args.char_latency)
+    pipeline = BlogPipeline(client, llm, sections=args.sections, concurrency=concurrency,
+                            sources_per_section=args.sources_per_section)
+    samples, sizes = [], []
+    try:
+        await client.create_all_sessions()
+        for i in range(args.repeats):
+            result = await timed(samples, pipeline.run(f"pipeline {uuid.uuid4().hex[:6]} box office week {i}"))
+            sizes.append(len(result))
+    finally:
+        await client.close_all_sessions()
+    return {**summarize(samples), "llm_calls": llm.calls // args.repeats,
+            "html_chars_mean": int(statistics.fmean(sizes))}
+
+
+async def main(args):
+    tmp = Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    site_port, exa_port, mcp_port = free_port(), free_port(), free_port()
+    site_url = f"http://127.0.0.1:{site_port}"
+    servers = [
+        uvicorn.Server(uvicorn.Config(fixture_site(load_pages(args.fixtures), args.site_latency, args.site_jitter),
+                                      port=site_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(fake_exa(site_url, args.exa_latency), port=exa_port, log_level="warning")),
+    ]
+    tasks = [asyncio.create_task(server.serve()) for server in servers]
+    env = {
+        **os.environ,
+        "EXA_API_KEY": "offline",
+        "EXA_BASE_URL": f"http://127.0.0.1:{exa_port}",
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(mcp_port),
+        "PAGE_CACHE_PATH": str(tmp / "pages.sqlite3"),
+        "DEDUP_INDEX_PATH": str(tmp / "fingerprints.sqlite3"),
+        "RETRIEVAL_ENABLED": "0",
+        "FETCH_MAX_PER_HOST": "32",  # every fixture page lives on one local host
+    }
+    mcp_server = subprocess.Popen([sys.executable, "-m", "mcpServerDocker.server"], cwd=ROOT,
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    mcp_config = {"mcpServers": {"web": {"url": f"http://127.0.0.1:{mcp_port}/sse"}}}
+    report = {"meta": {"revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                       "params": vars(args)}}
+    try:
+        for port in (site_port, exa_port, mcp_port):
+            await wait_for_port(port)
+        report["agent_sequential"] = await bench_agent(mcp_config, sequential_script(args.sources), args)
+        report["agent_batched"] = await bench_agent(mcp_config, BLOG_SCRIPT, args)
+        for concurrency in args.concurrency:
+            report[f"pipeline_c{concurrency}"] = await bench_pipeline(mcp_config, concurrency, args)
+    finally:
+        stop(mcp_server)
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*tasks)
+    baseline = report["agent_sequential"]["mean_ms"]
+    report["speedup_vs_agent_sequential"] = {name: round(baseline / result["mean_ms"], 2)
+                                             for name, result in report.items() if "mean_ms" in result}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=str(ROOT / "results"), help="directory of recorded *.html pages")
+    parser.add_argument("--site-latency", type=float, default=0.2, help="seconds each fixture page takes")
+    parser.add_argument("--site-jitter", type=float, default=0.05)
+    parser.add_argument("--exa-latency", type=float, default=0.3, help="seconds each fake Exa search takes")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per scripted model call")
+    parser.add_argument("--char-latency", type=float, default=0.001, help="extra seconds per reply character")
+    parser.add_argument("--sources", type=int, default=4, help="pages the agent scripts read")
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--sources-per-section", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+# bench_router.py
+"""LLM routing, hedging, failover and tiering with local fake chat models.
+
+Each scenario routes ``--calls`` requests through ``llmRouter.RouterChatModel`` over
+``ScriptedChatModel`` routes with configured latency, tail latency and failure rate:
+
+- ``single``: one fast route whose calls sometimes stall (the baseline)
+- ``routed``: that route plus a slower, steady one, without hedging
+- ``hedged``: the same routes with hedging past the fast route's p95
+- ``failover``: a route that always fails ahead of a working one
+- ``tiers``: a three-step research turn (two tool calls, then the answer) with one
+  slow model for everything vs a fast planner and the slow model as writer
+
+    python -m benchmarks.bench_router [--calls 200] [--seed 0]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from benchmarks.bench_e2e import ROOT, git_revision, summarize
+from benchmarks.fakes import ScriptedChatModel
+
+sys.path.insert(0, str(ROOT))
+
+from llmRouter import Route, RouterChatModel  # noqa: E402
+
+ANSWER = [{"content": "<html><body>done</body></html>"}]
+RESEARCH = [
+    {"tool_calls": [{"name": "exa_search_tool", "args": {"topic": "{prompt}"}}]},
+    {"tool_calls": [{"name": "webpage_scraper", "args": {"url": "https://example.com"}}]},
+    {"content": "<html><body>done</body></html>"},
+]
+
+
+def route(name: str, script=ANSWER, **behaviour) -> Route:
+    return Route(name, ScriptedChatModel(model=name, script=script, **behaviour))
+
+
+async def run_calls(router: RouterChatModel, calls: int) -> dict:
+    samples, errors, answered_by = [], 0, {}
+    for i in range(calls):
+        start = time.perf_counter()
+        try:
+            await router.ainvoke([HumanMessage(content=f"call {i}")])
+        except Exception:
+            errors += 1
+            continue
+        samples.append(time.perf_counter() - start)
+    for r in router.writer + router.planner:
+        answered_by[r.name] = r.stats.snapshot()
+    return {**summarize(samples), "p99_ms": round(sorted(samples)[int(len(samples) * 0.99)] * 1000, 1),
+            "errors": errors, "routes": answered_by}
+
+
+async def research_turn(router: RouterChatModel) -> float:
+    """One agent turn: model calls with tool results appended until a reply has no tool calls."""
+    messages = [HumanMessage(content="box office week")]
+    start = time.perf_counter()
+    while True:
+        reply = await router.ainvoke(messages)
+        if not reply.tool_calls:
+            return time.perf_counter() - start
+        messages.append(reply)
+        messages.extend(ToolMessage(content="result https://example.com/a", tool_call_id=call["id"],
+                                    name=call["name"]) for call in reply.tool_calls)
+
+
+async def main(args):
+    random.seed(args.seed)
+    fast = dict(latency=args.fast_latency, tail_latency=args.tail_latency, tail_rate=args.tail_rate)
+    steady = dict(latency=args.steady_latency)
+    report = {"meta": {"revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                       "params": vars(args)}}
+    report["single"] = await run_calls(RouterChatModel(writer=[route("fast", **fast)], hedge=False), args.calls)
+    report["routed"] = await run_calls(
+        RouterChatModel(writer=[route("fast", **fast), route("steady", **steady)], hedge=False), args.calls)
+    report["hedged"] = await run_calls(
+        RouterChatModel(writer=[route("fast", **fast), route("steady", **steady)], hedge=True), args.calls)
+    report["failover"] = await run_calls(
+        RouterChatModel(writer=[route("broken", error_rate=1.0), route("steady", **steady)]), args.calls)
+
+    writer_only = RouterChatModel(writer=[route("writer", RESEARCH, latency=args.writer_latency)])
+    tiered = RouterChatModel(planner=[route("planner", RESEARCH, latency=args.planner_latency)],
+                             writer=[route("writer", RESEARCH[-1:], latency=args.writer_latency)])
+    turns = max(1, args.calls // 20)
+    report["tiers"] = {
+        "writer_only": summarize([await research_turn(writer_only) for _ in range(turns)]),
+        "planner_and_writer": summarize([await research_turn(tiered) for _ in range(turns)]),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fast-latency", type=float, default=0.02)
+    parser.add_argument("--tail-latency", type=float, default=0.5, help="latency of the fast route's stalls")
+    parser.add_argument("--tail-rate", type=float, default=0.08)
+    parser.add_argument("--steady-latency", type=float, default=0.05)
+    parser.add_argument("--planner-latency", type=float, default=0.1)
+    parser.add_argument("--writer-latency", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,179 @@
+# bench_startup.py
+"""Import time and time-to-ready of the MCP servers and front ends.
+
+Two measurements per entry point, each in fresh interpreters:
+
+- ``imports``: ``python -X importtime -c "import <module>"``, reporting the module's
+  cumulative import time and its slowest direct imports (pass ``--raw-dir`` to keep
+  the full ``-X importtime`` logs for tools like tuna);
+- ``ready``: wall time from spawning the process until it can serve: the MCP
+  ``initialize`` handshake for the stdio server, the first accepted connection for
+  the SSE server, ``fastAPI.py`` and the Gradio app.
+
+``fastAPI.py`` is started against a config that spawns the local ``mcpServer.py``, and
+no API keys are needed since nothing is called. Entry points whose dependencies are
+not installed are reported as skipped.
+
+    python -m benchmarks.bench_startup [--repeats 5] [--top 10] [--raw-dir importtime/]
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.bench_e2e import ROOT, git_revision, stop, summarize
+from benchmarks.load_sse import free_port
+
+# name -> (module imported by -X importtime, extra sys.path entry, required third-party package)
+MODULES = {
+    "mcpServer": ("mcpServer", None, "mcp"),
+    "mcpServerDocker": ("mcpServerDocker.server", None, "mcp"),
+    "fastAPI": ("fastAPI", None, "fastapi"),
+    "app": ("app", None, "gradio"),
+}
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(log: str) -> list[tuple[int, str, int]]:
+    """``(depth, module, cumulative_us)`` for each line of an ``-X importtime`` log."""
+    rows = []
+    for line in log.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            rows.append((len(match.group(3)) // 2, match.group(4), int(match.group(2))))
+    return rows
+
+
+def profile_imports(module: str, path: Path | None, env: dict, top: int, raw_dir: Path | None) -> dict:
+    code = (f"import sys; sys.path.insert(0, {str(path)!r}); " if path else "") + f"import {module}"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if raw_dir is not None:
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        (raw_dir / f"{module}.importtime.txt").write_text(result.stderr)
+    rows = parse_importtime(result.stderr)
+    # A module's line comes after the lines of everything it imported, so its children precede it
+    total = next((cumulative for depth, name, cumulative in rows if depth == 0 and name == module), None)
+    children = []
+    for depth, name, cumulative in reversed(rows):
+        if depth == 0 and name != module and children:
+            break
+        if depth == 1:
+            children.append((name, cumulative))
+    slowest = sorted(children, key=lambda c: c[1], reverse=True)[:top]
+    return {
+        "process_seconds": round(wall, 3),
+        "import_ms": round(total / 1000, 1) if total is not None else None,
+        "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        **({"error": result.stderr.strip().splitlines()[-1]} if result.returncode else {}),
+    }
+
+
+async def ready_stdio(env: dict) -> float:
+    params = StdioServerParameters(command=sys.executable, args=[str(ROOT / "mcpServer.py")], env=env, cwd=str(ROOT))
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            return time.perf_counter() - start
+
+
+async def ready_port(command: list[str], env: dict, port: int, timeout: float = 120) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    return time.perf_counter() - start
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"{command[-1]} exited with code {process.returncode}") from None
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError(f"{command[-1]} not listening after {timeout:.0f}s") from None
+                await asyncio.sleep(0.01)
+    finally:
+        stop(process)
+
+
+async def time_to_ready(name: str, env: dict, tmp: Path) -> float:
+    port = free_port()
+    if name == "mcpServer":
+        return await ready_stdio(env)
+    if name == "mcpServerDocker":
+        return await ready_port([sys.executable, "-m", "mcpServerDocker.server"],
+                                {**env, "MCP_HOST": "127.0.0.1", "MCP_PORT": str(port)}, port)
+    if name == "fastAPI":
+        return await ready_port([sys.executable, "-m", "uvicorn", "fastAPI:app", "--port", str(port)], env, port)
+    return await ready_port([sys.executable, str(ROOT / "app.py")], {**env, "GRADIO_SERVER_PORT": str(port)}, port)
+
+
+async def main(args):
+    tmp = Path(tempfile.mkdtemp(prefix="bench_startup_"))
+    config_path = tmp / "mcp.json"
+    config_path.write_text(json.dumps({"mcpServers": {"web": {
+        "command": sys.executable, "args": [str(ROOT / "mcpServer.py")]}}}))
+    env = {
+        **os.environ,
+        "EXA_API_KEY": os.getenv("EXA_API_KEY", "offline"),
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "offline"),
+        "MCP_CONFIG": str(config_path),
+        "PAGE_CACHE_PATH": str(tmp / "pages.sqlite3"),
+        "DEDUP_INDEX_PATH": str(tmp / "fingerprints.sqlite3"),
+        "JOB_DB_PATH": str(tmp / "jobs.sqlite3"),
+        "JOB_RESULTS_DIR": str(tmp / "results"),
+        "GRADIO_ANALYTICS_ENABLED": "False",
+    }
+    report = {"meta": {"revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                       "python": platform.python_version(), "params": vars(args)}}
+    for name in args.targets:
+        module, path, requirement = MODULES[name]
+        if importlib.util.find_spec(requirement) is None:
+            report[name] = {"skipped": f"{requirement} is not installed"}
+            continue
+        imports = [profile_imports(module, path, env, args.top, Path(args.raw_dir) if args.raw_dir else None)
+                   for _ in range(args.repeats)]
+        ready, errors = [], []
+        for _ in range(args.repeats):
+            try:
+                ready.append(await time_to_ready(name, env, tmp))
+            except Exception as e:
+                errors.append(str(e))
+        best = min(imports, key=lambda i: i["import_ms"] or float("inf"))
+        report[name] = {
+            "import": summarize([i["import_ms"] / 1000 for i in imports if i["import_ms"] is not None]),
+            "slowest_imports_ms": best["slowest_imports_ms"],
+            "ready": summarize(ready),
+            **({"errors": errors} if errors else {}),
+            **({"import_error": best["error"]} if "error" in best else {}),
+        }
+        print(f"{name}: import p50 {report[name]['import'].get('p50_ms')} ms, "
+              f"ready p50 {report[name]['ready'].get('p50_ms')} ms", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", choices=list(MODULES), default=list(MODULES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports listed per module")
+    parser.add_argument("--raw-dir", help="keep the -X importtime logs here")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
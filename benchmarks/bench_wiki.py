@@ -0,0 +1,155 @@
+# bench_wiki.py
+"""Lookup latency of the local Wikipedia dump (wikiDump.py).
+
+Without ``--dump``/``--index`` it writes a small multistream fixture dump (bz2 streams
+of 100 pages, with templates, references, links and redirects in the wikitext) and
+its index into a temp directory, so the lookup path can be exercised offline. It
+then compiles the index and times cold lookups (stream not yet decoded), warm
+lookups, redirects and misses. ``--online N`` also times N lookups through the live
+API for comparison.
+
+    python -m benchmarks.bench_wiki [--pages 20000] [--lookups 200] [--online 5]
+"""
+import argparse
+import asyncio
+import bz2
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import wikiDump  # noqa: E402
+from benchmarks.bench_e2e import summarize  # noqa: E402
+
+PER_STREAM = 100
+WORDS = "film studio release audience critic award season festival director budget premiere record".split()
+
+
+def _wikitext(i: int, rng: random.Random) -> str:
+    sentences = [" ".join(rng.choice(WORDS) for _ in range(14)).capitalize() + "." for _ in range(30)]
+    return (
+        "{{Infobox film | name = Fixture Article %d | budget = {{US$|%d million}} }}\n"
+        "'''Fixture Article %d''' is a [[film]] about the [[box office|box-office]] week.<ref>{{cite web|url=x}}</ref> "
+        "%s\n\n== Production ==\n%s [[File:Poster %d.jpg|thumb|A [[poster]]]]\n\n"
+        "{| class=\"wikitable\"\n|-\n| cell || cell\n|}\n== Reception ==\n%s\n[[Category:Fixture films]]"
+    ) % (i, i, i, " ".join(sentences[:10]), " ".join(sentences[10:20]), i, " ".join(sentences[20:]))
+
+
+def _page_xml(page_id: int, title: str, text: str = "", redirect: str | None = None) -> str:
+    redirect_tag = f'<redirect title="{redirect}" />' if redirect else ""
+    text = text if not redirect else f"#REDIRECT [[{redirect}]]"
+    escaped = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return (f"  <page>\n    <title>{title}</title>\n    <ns>0</ns>\n    <id>{page_id}</id>\n    {redirect_tag}\n"
+            f"    <revision><text xml:space=\"preserve\">{escaped}</text></revision>\n  </page>\n")
+
+
+def write_fixture_dump(directory: Path, pages: int, seed: int = 0) -> tuple[Path, Path]:
+    """A multistream dump and bz2 index of ``pages`` articles; every tenth page is a redirect."""
+    rng = random.Random(seed)
+    dump_path, index_path = directory / "fixture-multistream.xml.bz2", directory / "fixture-multistream-index.txt.bz2"
+    index_lines = []
+    with open(dump_path, "wb") as dump:
+        dump.write(bz2.compress(b'<mediawiki xml:lang="en">\n  <siteinfo><sitename>Fixture</sitename></siteinfo>\n'))
+        for start in range(0, pages, PER_STREAM):
+            offset, chunk = dump.tell(), []
+            for i in range(start, min(start + PER_STREAM, pages)):
+                if i % 10 == 9:
+                    title = f"Alias {i}"
+                    chunk.append(_page_xml(i + 1, title, redirect=f"Fixture Article {i - 1}"))
+                else:
+                    title = f"Fixture Article {i}"
+                    chunk.append(_page_xml(i + 1, title, _wikitext(i, rng)))
+                index_lines.append(f"{offset}:{i + 1}:{title}\n")
+            dump.write(bz2.compress("".join(chunk).encode()))
+        dump.write(bz2.compress(b"</mediawiki>\n"))
+    index_path.write_bytes(bz2.compress("".join(index_lines).encode()))
+    return dump_path, index_path
+
+
+async def timed_online(titles: list[str], report: dict) -> dict:
+    online = []
+    for title in titles:
+        start = time.perf_counter()
+        try:
+            await wikiDump.lookup_online(title)
+        except Exception as e:  # network unavailable
+            report["online_error"] = str(e)
+            break
+        online.append(time.perf_counter() - start)
+    return summarize(online)
+
+
+def timed_lookups(dump: wikiDump.WikiDump, titles: list[str]) -> tuple[list[float], int]:
+    samples, found = [], 0
+    for title in titles:
+        start = time.perf_counter()
+        article = dump.lookup(title)
+        samples.append(time.perf_counter() - start)
+        found += article is not None
+    return samples, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dump", help="multistream .xml.bz2 (default: generate a fixture)")
+    parser.add_argument("--index", help="multistream index .txt(.bz2) matching --dump")
+    parser.add_argument("--titles", nargs="*", help="titles to look up in a real dump")
+    parser.add_argument("--pages", type=int, default=20000, help="fixture size")
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--online", type=int, default=0, help="also time this many live API lookups")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_wiki_"))
+    rng = random.Random(1)
+    if args.dump:
+        dump_path, index_path = Path(args.dump), Path(args.index)
+        titles = args.titles or [t for _, t in wikiDump._read_index_lines(str(index_path))][:args.lookups]
+        redirects = []
+    else:
+        start = time.perf_counter()
+        dump_path, index_path = write_fixture_dump(tmp, args.pages)
+        print(f"Wrote fixture dump of {args.pages} pages in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        articles = [i for i in range(args.pages) if i % 10 != 9]
+        # One title per stream so every cold lookup decodes a different stream
+        streams = list(range(0, args.pages, PER_STREAM))
+        titles = [f"Fixture Article {rng.choice([i for i in articles if s <= i < s + PER_STREAM])}"
+                  for s in rng.sample(streams, min(args.lookups, len(streams)))]
+        redirects = [f"alias {i}" for i in rng.sample([i for i in range(args.pages) if i % 10 == 9],
+                                                     min(args.lookups, args.pages // 10))]
+
+    start = time.perf_counter()
+    entries = wikiDump.build_index(str(index_path), str(tmp / "index"))
+    build_seconds = time.perf_counter() - start
+
+    dump = wikiDump.WikiDump(str(dump_path), str(tmp / "index"), stream_cache_size=len(titles) + len(redirects))
+    cold, found = timed_lookups(dump, titles)
+    warm, _ = timed_lookups(dump, titles)
+    redirect_samples, redirects_found = timed_lookups(dump, redirects)
+    missing, _ = timed_lookups(dump, [f"No Such Article {i}" for i in range(args.lookups)])
+    sample = dump.lookup(titles[0]) if titles else None
+    dump.close()
+
+    report = {
+        "dump": str(dump_path),
+        "dump_mb": round(dump_path.stat().st_size / 1e6, 2),
+        "index_entries": entries,
+        "index_build_seconds": round(build_seconds, 3),
+        "cold": {**summarize(cold), "found": found},
+        "warm": summarize(warm),
+        "redirect": {**summarize(redirect_samples), "found": redirects_found},
+        "missing": summarize(missing),
+        "sample": {"title": sample["title"], "url": sample["url"], "summary": sample["summary"][:200]} if sample else None,
+    }
+    if args.online:
+        online_titles = (titles if args.dump else ["Python (programming language)", "Box office", "Film"])
+        report["online"] = asyncio.run(timed_online(online_titles[:args.online], report))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
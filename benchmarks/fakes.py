@@ -0,0 +1,255 @@
+# fakes.py
+"""Offline stand-ins for the network services the blog agent depends on.
+
+- ``fixture_site``: serves recorded HTML pages with configurable latency
+- ``fake_exa``: answers the Exa ``/search`` endpoint with results pointing at the fixture site
+- ``ScriptedChatModel``: a LangChain chat model that replays a fixed tool-call sequence
+
+Together they let the benchmarks drive the real MCP servers, agents and front ends
+without API keys or internet access.
+"""
+import asyncio
+import html
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, JSONResponse
+from starlette.routing import Route
+
+WORDS = ("market film release review box office star director music budget audience week record critic "
+         "season premiere studio streaming sequel trailer festival award cast story").split()
+
+# Search, read the top three hits, write the post
+BLOG_SCRIPT = [
+    {"tool_calls": [{"name": "exa_search_tool", "args": {"topic": "{prompt}", "num_results": 5}}]},
+    {"tool_calls": [{"name": "webpage_scraper_batch", "args": {"urls": "$urls:3"}}]},
+    {"content": "$blog"},
+]
+
+# Replies to blogPipeline.py's outline and section calls, chosen by the run's tag
+PIPELINE_SCRIPTS = {
+    "blog_outline": [{"content": "$outline"}],
+    "blog_section": [{"content": "$section"}],
+}
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40] or "page"
+
+
+def load_pages(fixtures: Path) -> list[str]:
+    """Recorded pages from a directory of ``*.html`` files."""
+    return [path.read_text(encoding="utf-8", errors="replace") for path in sorted(Path(fixtures).glob("*.htm*"))]
+
+
+def fixture_site(pages: list[str], latency: float = 0.2, jitter: float = 0.0, paragraphs: int = 40) -> Starlette:
+    """Serve ``/articles/{name}`` after ``latency`` (± ``jitter``) seconds.
+
+    Each name maps to one of the recorded ``pages`` with a block of generated paragraphs
+    seeded by the name appended, so every URL extracts to distinct text; otherwise
+    near-duplicate detection would short-circuit every scrape after the first.
+    """
+    rng = random.Random(0)
+    pool = [" ".join(rng.choice(WORDS) for _ in range(60)) for _ in range(1000)]
+
+    async def article(request):
+        name = request.path_params["name"]
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        seeded = random.Random(name)
+        extra = "".join(f"<p>{p}</p>" for p in seeded.sample(pool, paragraphs))
+        page = pages[seeded.randrange(len(pages))] if pages else "<html><body></body></html>"
+        if "</body>" in page:
+            page = page.replace("</body>", f"<article>{extra}</article></body>", 1)
+        else:
+            page += f"<article>{extra}</article>"
+        return HTMLResponse(page)
+
+    return Starlette(routes=[Route("/articles/{name}", article)])
+
+
+def fake_exa(site_url: str, latency: float = 0.3) -> Starlette:
+    """Answer ``POST /search`` like Exa's search-and-contents call.
+
+    Results are deterministic per query and point at ``site_url``, so a repeated query
+    hits the same pages and a new query gets fresh ones.
+    """
+    rng = random.Random(1)
+    pool = [" ".join(rng.choice(WORDS) for _ in range(80)) for _ in range(200)]
+    stats = {"searches": 0}
+
+    async def search(request):
+        body = await request.json()
+        stats["searches"] += 1
+        await asyncio.sleep(latency)
+        query = body.get("query", "")
+        slug = slugify(query)
+        seeded = random.Random(query)
+        results = []
+        for i in range(int(body.get("numResults", 10))):
+            text = " ".join(seeded.sample(pool, 5))
+            results.append({
+                "id": f"{slug}-{i}",
+                "url": f"{site_url}/articles/{slug}-{i}",
+                "title": f"{query.title()} ({i + 1})",
+                "score": round(1 - i / 20, 3),
+                "publishedDate": "2025-05-01T00:00:00.000Z",
+                "author": "Fixture Desk",
+                "text": text,
+                "highlights": [text[:200]],
+                "highlightScores": [0.9],
+            })
+        return JSONResponse({"results": results, "resolvedSearchType": "neural", "requestId": slug})
+
+    async def stats_view(request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[Route("/search", search, methods=["POST"]), Route("/stats", stats_view)])
+
+
+def _tool_urls(messages: list) -> list[str]:
+    urls = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            for url in re.findall(r"https?://[^\s\"'<>\\]+", str(message.content)):
+                if url not in urls:
+                    urls.append(url)
+    return urls
+
+
+def _render_outline(prompt: str, sections: int = 4) -> str:
+    angles = ["opening numbers", "the big releases", "audience and critics", "what comes next", "the studios",
+              "streaming"]
+    return json.dumps({
+        "title": prompt,
+        "intro": f"A look at {prompt}.",
+        "sections": [{"heading": angle.capitalize(), "query": f"{prompt} {angle}"} for angle in angles[:sections]],
+        "conclusion": "That is the week in review.",
+    })
+
+
+def _render_section(request: str) -> str:
+    heading = re.search(r"^Section: (.*)$", request, re.MULTILINE)
+    sources = re.split(r"^Source \d+: ", request, flags=re.MULTILINE)[1:]
+    paragraphs = "\n".join(f"<p>{html.escape(source[:300])}</p>" for source in sources)
+    return f"<h2>{html.escape(heading.group(1) if heading else 'Section')}</h2>\n{paragraphs}"
+
+
+def _render_blog(prompt: str, messages: list) -> str:
+    sections = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            excerpt = html.escape(str(message.content)[:600])
+            sections.append(f"<h2>{html.escape(message.name or 'Source')}</h2>\n<p>{excerpt}</p>")
+    title = html.escape(prompt)
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n"
+        f"  <title>{title}</title>\n"
+        "  <style>body { font-family: Arial, sans-serif; max-width: 800px; margin: auto; }</style>\n"
+        "</head>\n<body>\n"
+        f"<h1>{title}</h1>\n" + "\n".join(sections) + "\n</body>\n</html>"
+    )
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Replays ``script`` one step per model call within a turn.
+
+    Each step is either ``{"tool_calls": [{"name", "args"}]}`` or ``{"content": str}``.
+    String arguments may use ``{prompt}`` for the user's message; ``"$urls:N"`` expands
+    to the first N URLs seen in tool results so far and ``"$url:N"`` to the N-th (from
+    0), and content ``"$blog"`` renders a small HTML post from the tool results. Runs
+    tagged with a key of ``stage_scripts`` replay that script instead; ``"$outline"``
+    and ``"$section"`` answer the calls of ``blogPipeline.py``.
+
+    ``latency`` simulates model think time and ``char_latency`` adds decode time per
+    character of the reply, so long answers take longer than tool calls. ``tail_rate``
+    of the calls take ``tail_latency`` instead and ``error_rate`` of them raise, to
+    exercise routing, hedging and failover (``llmRouter.py``).
+    """
+
+    script: list[dict] = BLOG_SCRIPT
+    stage_scripts: dict[str, list[dict]] = PIPELINE_SCRIPTS
+    latency: float = 0.0
+    tail_latency: float = 0.0
+    tail_rate: float = 0.0
+    error_rate: float = 0.0
+    char_latency: float = 0.0
+    model: str = "scripted"
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model}
+
+    def _delay(self) -> float:
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError(f"{self.model}: injected failure")
+        return self.tail_latency if self.tail_rate and random.random() < self.tail_rate else self.latency
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages: list, tags: list[str] | None = None) -> AIMessage:
+        self.calls += 1
+        start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+        prompt = str(messages[start].content) if messages else ""
+        turn = messages[start + 1:]
+        step_index = sum(1 for m in turn if isinstance(m, AIMessage) and m.tool_calls)
+        script = next((self.stage_scripts[tag] for tag in tags or [] if tag in self.stage_scripts), self.script)
+        step = script[min(step_index, len(script) - 1)]
+
+        def fill(value: Any) -> Any:
+            if isinstance(value, str) and value.startswith("$url:"):
+                urls = _tool_urls(turn)
+                index = int(value.partition(":")[2])
+                return urls[index] if index < len(urls) else ""
+            if isinstance(value, str) and value.startswith("$urls"):
+                _, _, limit = value.partition(":")
+                urls = _tool_urls(turn)
+                return urls[:int(limit)] if limit else urls
+            if isinstance(value, str):
+                return value.replace("{prompt}", prompt)
+            return value
+
+        if "tool_calls" in step:
+            calls = [
+                {"name": call["name"], "args": {k: fill(v) for k, v in call["args"].items()},
+                 "id": f"call_{step_index}_{i}", "type": "tool_call"}
+                for i, call in enumerate(step["tool_calls"])
+            ]
+            return AIMessage(content="", tool_calls=calls)
+        content = step["content"]
+        if content == "$blog":
+            return AIMessage(content=_render_blog(prompt, turn))
+        if content == "$outline":
+            return AIMessage(content=_render_outline(prompt))
+        if content == "$section":
+            return AIMessage(content=_render_section(prompt))
+        return AIMessage(content=fill(content))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay = self._delay()
+        message = self._reply(messages, run_manager.tags if run_manager else None)
+        time.sleep(delay + len(str(message.content)) * self.char_latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay = self._delay()
+        message = self._reply(messages, run_manager.tags if run_manager else None)
+        await asyncio.sleep(delay + len(str(message.content)) * self.char_latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def load_script(path: str | None) -> list[dict]:
+    return json.loads(Path(path).read_text()) if path else BLOG_SCRIPT
@@ -0,0 +1,144 @@
+# load_sse.py
+"""Load test for the SSE MCP server (mcpServerDocker/server.py).
+
+Starts a local site whose pages respond after a fixed delay, launches the SSE server
+in a subprocess with throwaway caches, then has 1..N MCP clients call
+``webpage_scraper`` concurrently. If tool calls do not block each other, throughput
+grows roughly linearly with the number of clients.
+
+    python -m benchmarks.load_sse [--clients 1 2 4 8] [--requests 5] [--delay 0.5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse
+from starlette.routing import Route
+
+ROOT = Path(__file__).resolve().parent.parent
+WORDS = "market film release review box office star director music budget audience week record critic".split()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def slow_site(delay: float) -> Starlette:
+    rng = random.Random(0)
+    pool = [f"<p>{' '.join(rng.choice(WORDS) for _ in range(60))}</p>" for _ in range(2000)]
+
+    async def page(request):
+        await asyncio.sleep(delay)
+        # A distinct paragraph selection per page keeps pages from looking like duplicates
+        paragraphs = "".join(random.Random(request.path_params["name"]).sample(pool, 200))
+        return HTMLResponse(f"<html><body><article>{paragraphs}</article></body></html>")
+
+    return Starlette(routes=[Route("/page/{name}", page)])
+
+
+async def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"nothing listening on port {port}")
+
+
+async def client_run(server_url: str, site: str, client: int, requests: int, run: str) -> list[float]:
+    latencies = []
+    async with sse_client(server_url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for i in range(requests):
+                start = time.perf_counter()
+                await session.call_tool("webpage_scraper", {"url": f"{site}/page/{run}-{client}-{i}"})
+                latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=5, help="sequential tool calls per client")
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds each page takes to respond")
+    args = parser.parse_args()
+
+    site_port, mcp_port = free_port(), free_port()
+    site = uvicorn.Server(uvicorn.Config(slow_site(args.delay), port=site_port, log_level="warning"))
+    site_task = asyncio.create_task(site.serve())
+
+    tmp = tempfile.mkdtemp(prefix="load_sse_")
+    env = {
+        **os.environ,
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(mcp_port),
+        "PAGE_CACHE_PATH": f"{tmp}/pages.sqlite3",
+        "DEDUP_INDEX_PATH": f"{tmp}/fingerprints.sqlite3",
+        "RETRIEVAL_ENABLED": "0",
+        # Every page lives on one local host; lift the per-host cap so it does not serialize the clients
+        "FETCH_MAX_PER_HOST": str(max(args.clients)),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "mcpServerDocker.server"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    results = []
+    try:
+        await wait_for_port(site_port)
+        await wait_for_port(mcp_port)
+        server_url = f"http://127.0.0.1:{mcp_port}/sse"
+        site_url = f"http://127.0.0.1:{site_port}"
+        for clients in args.clients:
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(
+                client_run(server_url, site_url, c, args.requests, f"n{clients}") for c in range(clients)
+            ))
+            elapsed = time.perf_counter() - start
+            calls = clients * args.requests
+            flat = sorted(l for ls in latencies for l in ls)
+            results.append({
+                "clients": clients,
+                "calls": calls,
+                "seconds": round(elapsed, 3),
+                "throughput_calls_s": round(calls / elapsed, 2),
+                "p50_ms": round(flat[len(flat) // 2] * 1000, 1),
+                "max_ms": round(flat[-1] * 1000, 1),
+            })
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:  # uvicorn waits on lingering SSE streams
+            server.kill()
+        site.should_exit = True
+        await site_task
+
+    base = results[0]["throughput_calls_s"] / results[0]["clients"]
+    print(f"{'clients':>8}{'calls/s':>10}{'speedup':>10}{'ideal':>8}{'p50 ms':>10}{'max ms':>10}")
+    for r in results:
+        r["speedup"] = round(r["throughput_calls_s"] / base, 2)
+        print(f"{r['clients']:>8}{r['throughput_calls_s']:>10}{r['speedup']:>10}{r['clients']:>8}"
+              f"{r['p50_ms']:>10}{r['max_ms']:>10}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+# blocking.py
+"""Bounded thread pool for the blocking parts of the async MCP tools.
+
+Exa SDK calls, HTML parsing and cache/dedup bookkeeping run here instead of on the
+server's event loop, so one slow site or search cannot stall other clients.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIG ---
+WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="mcp-tool")
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run ``fn(*args, **kwargs)`` on the shared pool and await the result."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
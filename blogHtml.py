@@ -0,0 +1,17 @@
+# blogHtml.py
+"""Helpers for the HTML documents the agents and the pipeline produce."""
+import re
+
+_FENCE = re.compile(r"```(?:html)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def extract_html(response: str) -> str:
+    """Strip a markdown code fence around the generated document, if any."""
+    match = _FENCE.search(response)
+    return match.group(1).strip() if match else response.strip()
+
+
+def is_blog(response: str) -> bool:
+    """Whether ``response`` holds an HTML document rather than prose or an error message."""
+    html = extract_html(response).lower()
+    return "<html" in html or "<h1" in html
@@ -0,0 +1,204 @@
+# blogPipeline.py
+"""Fan-out/fan-in blog generation: outline, parallel sections, merge.
+
+The agent path walks one tool call after another (search, scrape, scrape, ...) and
+writes the whole post in a final call, so its latency is the sum of every step.
+``BlogPipeline`` splits the post instead:
+
+1. one model call plans an outline: a title, an introduction, a conclusion and up to
+   ``PIPELINE_SECTIONS`` sections, each with its own search query;
+2. every section is researched (``exa_search_tool``, then ``webpage_scraper_batch`` on
+   its top hits) and drafted as an HTML fragment by its own model call, at most
+   ``PIPELINE_CONCURRENCY`` sections at a time;
+3. the fragments are merged into one styled HTML document with a list of sources.
+
+It calls the same MCP tools through the client's sessions, so it shares the servers'
+caches with the agents. There is no conversation memory; it answers opening requests.
+"""
+import asyncio
+import html
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from loguru import logger
+from mcp_use import MCPClient
+
+import metrics
+from blogHtml import extract_html
+
+# --- CONFIG ---
+SECTIONS = int(os.getenv("PIPELINE_SECTIONS", "4"))
+CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "4"))  # sections researched and drafted at once
+SOURCES_PER_SECTION = int(os.getenv("PIPELINE_SOURCES_PER_SECTION", "2"))
+SOURCE_CHARS = int(os.getenv("PIPELINE_SOURCE_CHARS", "3000"))  # text per source handed to the section writer
+
+OUTLINE_PROMPT = """You plan blog posts. Reply with JSON only, no prose, in this form:
+{{"title": "...", "intro": "one or two sentences", "sections": [{{"heading": "...", "query": "web search query for this section"}}], "conclusion": "one or two sentences"}}
+Use at most {sections} sections. Each query must find recent sources for its section on its own."""
+
+SECTION_PROMPT = """You write one section of a blog post as an HTML fragment.
+Use the sources given; do not invent facts. Start with <h2>heading</h2>, then short <p> paragraphs.
+If the sources list images, include the most relevant one as <img src="image_url" alt="...">.
+Reply with the fragment only: no <html>, <head>, <body> or <style>, no markdown."""
+
+STYLE = """body { font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: auto; padding: 20px; }
+img { max-width: 100%; height: auto; display: block; margin: 20px 0; }
+h1, h2 { color: #333; }
+p { color: #555; }
+.sources { font-size: 0.9em; }"""
+
+_JSON = re.compile(r"\{.*\}", re.DOTALL)
+_BODY = re.compile(r"<body[^>]*>(.*?)</body>", re.DOTALL | re.IGNORECASE)
+
+
+@dataclass
+class Section:
+    heading: str
+    query: str
+    html: str = ""
+    sources: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Outline:
+    title: str
+    intro: str
+    sections: list[Section]
+    conclusion: str = ""
+
+
+def parse_outline(text: str, prompt: str, max_sections: int = SECTIONS) -> Outline:
+    """Outline from the planner's JSON; a single section on the prompt itself if it is unusable."""
+    try:
+        data = json.loads(_JSON.search(text).group(0))
+        sections = [Section(str(s["heading"]), str(s.get("query") or s["heading"]))
+                    for s in data["sections"][:max_sections] if s.get("heading")]
+        if sections:
+            return Outline(str(data.get("title") or prompt), str(data.get("intro", "")), sections,
+                           str(data.get("conclusion", "")))
+    except (AttributeError, ValueError, KeyError, TypeError):
+        pass
+    logger.warning("Outline was not valid JSON; writing a single section")
+    return Outline(prompt, "", [Section(prompt, prompt)])
+
+
+def fragment(text: str) -> str:
+    """The HTML fragment of a section reply, unwrapping a code fence or a whole document."""
+    text = extract_html(text)
+    body = _BODY.search(text)
+    return (body.group(1) if body else text).strip()
+
+
+def merge(outline: Outline) -> str:
+    """One styled HTML document from the outline and its drafted sections."""
+    title = html.escape(outline.title)
+    parts = [f"<h1>{title}</h1>"]
+    if outline.intro:
+        parts.append(f"<p>{html.escape(outline.intro)}</p>")
+    parts += [section.html for section in outline.sections if section.html]
+    if outline.conclusion:
+        parts.append(f"<h2>Conclusion</h2>\n<p>{html.escape(outline.conclusion)}</p>")
+    sources = list(dict.fromkeys(url for section in outline.sections for url in section.sources))
+    if sources:
+        links = "\n".join(f'  <li><a href="{html.escape(url)}">{html.escape(url)}</a></li>' for url in sources)
+        parts.append(f'<h2>Sources</h2>\n<ul class="sources">\n{links}\n</ul>')
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n"
+        f"  <meta charset=\"utf-8\">\n  <title>{title}</title>\n  <style>\n{STYLE}\n  </style>\n"
+        "</head>\n<body>\n" + "\n".join(parts) + "\n</body>\n</html>"
+    )
+
+
+def _text(result) -> str:
+    """Text content of an MCP tool result."""
+    return "\n".join(getattr(item, "text", "") for item in result.content)
+
+
+class BlogPipeline:
+    def __init__(self, client: MCPClient, llm, sections: int = SECTIONS, concurrency: int = CONCURRENCY,
+                 sources_per_section: int = SOURCES_PER_SECTION):
+        self.client = client
+        self.llm = llm
+        self.sections = sections
+        self.concurrency = concurrency
+        self.sources_per_section = sources_per_section
+
+    async def _session_for(self, tool: str):
+        sessions = self.client.get_all_active_sessions() or await self.client.create_all_sessions()
+        for session in sessions.values():
+            if any(t.name == tool for t in session.connector.tools):
+                return session
+        raise RuntimeError(f"No MCP server provides {tool}")
+
+    async def call_tool(self, tool: str, arguments: dict) -> str:
+        session = await self._session_for(tool)
+        return _text(await session.call_tool(tool, arguments))
+
+    async def _ask(self, stage: str, system: str, user: str) -> str:
+        message = await self.llm.ainvoke([SystemMessage(system), HumanMessage(user)],
+                                         config={"tags": [f"blog_{stage}"], "run_name": f"blog_{stage}"})
+        return str(message.content)
+
+    async def outline(self, prompt: str) -> Outline:
+        with metrics.span("pipeline", "outline"):
+            reply = await self._ask("outline", OUTLINE_PROMPT.format(sections=self.sections), prompt)
+        return parse_outline(reply, prompt, self.sections)
+
+    async def research(self, section: Section) -> list[dict]:
+        """Search for the section's query and scrape its top hits; ``[{"url", "content"}]``."""
+        found = await self.call_tool("exa_search_tool", {"topic": section.query,
+                                                         "num_results": self.sources_per_section})
+        try:
+            results = json.loads(found)["results"]
+        except (ValueError, KeyError, TypeError):
+            raise RuntimeError(f"Search failed for '{section.query}': {found[:200]}") from None
+        hits = {r["url"]: r.get("text", "") for r in results}
+        scraped = json.loads(await self.call_tool("webpage_scraper_batch", {"urls": list(hits)}))
+        sources = []
+        for page in scraped:
+            content = page["content"]
+            if content.startswith(("Error", "Duplicate of")):
+                content = hits.get(page["url"], "")  # fall back to the search result's text
+            if content:
+                sources.append({"url": page["url"], "content": content})
+        return sources
+
+    async def draft(self, outline: Outline, section: Section, sources: list[dict]) -> str:
+        listing = []
+        for i, source in enumerate(sources, 1):
+            # The scraper lists images after the text; keep them even when the text is truncated
+            text, _, images = source["content"].partition("\n\nImages:\n")
+            listing.append(f"Source {i}: {source['url']}\n{text[:SOURCE_CHARS]}"
+                           + (f"\nImages:\n{images}" if images else ""))
+        reply = await self._ask("section", SECTION_PROMPT,
+                                f"Blog: {outline.title}\nSection: {section.heading}\n\n" + "\n\n".join(listing))
+        return fragment(reply)
+
+    async def _section(self, outline: Outline, section: Section, slots: asyncio.Semaphore,
+                       on_progress: Callable[[str], None]):
+        async with slots:
+            try:
+                with metrics.span("pipeline", "section"):
+                    on_progress(f"researching '{section.heading}'")
+                    sources = await self.research(section)
+                    section.sources = [source["url"] for source in sources]
+                    on_progress(f"drafting '{section.heading}' from {len(sources)} sources")
+                    section.html = await self.draft(outline, section, sources)
+            except Exception as e:
+                metrics.count_error("pipeline", e)
+                logger.warning(f"Section '{section.heading}' failed: {e}")
+
+    async def run(self, prompt: str, on_progress: Callable[[str], None] = lambda message: None) -> str:
+        """Generate a blog post for ``prompt`` and return its HTML."""
+        with metrics.span("pipeline", "run"):
+            outline = await self.outline(prompt)
+            on_progress(f"outlined {len(outline.sections)} sections")
+            slots = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._section(outline, s, slots, on_progress) for s in outline.sections))
+            if not any(section.html for section in outline.sections):
+                raise RuntimeError("Every section failed; see the log")
+            return merge(outline)
@@ -0,0 +1,270 @@
+# blogStore.py
+"""Content-addressed store of generated blogs with a semantic prompt cache.
+
+Each blog is written once, zlib-compressed, under ``objects/<aa>/<sha256>.html.z``,
+so regenerating identical HTML costs no extra space. A SQLite index records every
+(prompt, blog) pair with its date, the source URLs the blog links to and an
+embedding of the prompt (the same fastembed model as ``retrieval.py``).
+
+``lookup`` answers a new prompt from the store when a prompt written within the
+freshness window is the same after normalization, or close enough in embedding
+space, shares most of its topic words and mentions the same numbers ("HIT 3" must
+not match "HIT 2"). Front ends
+check it before running the agent, so near-identical requests return in
+milliseconds instead of rerunning the whole research loop.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+import metrics
+from blogHtml import extract_html, is_blog
+
+# --- CONFIG ---
+ENABLED = os.getenv("BLOG_CACHE_ENABLED", "1") != "0"
+STORE_DIR = os.getenv("BLOG_STORE_DIR", ".cache/blogs")
+MAX_AGE = float(os.getenv("BLOG_CACHE_MAX_AGE_HOURS", "24")) * 3600  # news goes stale; older blogs are not served
+THRESHOLD = float(os.getenv("BLOG_CACHE_THRESHOLD", "0.9"))  # cosine similarity of prompt embeddings
+TOPIC_OVERLAP = float(os.getenv("BLOG_CACHE_TOPIC_OVERLAP", "0.5"))  # Jaccard overlap of the prompts' topic words
+EMBED_RETRY = float(os.getenv("BLOG_CACHE_EMBED_RETRY_SECONDS", "300"))  # wait after a failed embedding
+
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+_NUMBER = re.compile(r"\d+(?:\.\d+)*")
+# Request phrasing that says nothing about the topic ("write a blog post about ...")
+_FILLER = frozenset(
+    "a about an and article blog can could create for generate give i in latest me my new news on "
+    "please post recent the to today write you".split()
+)
+_LINK = re.compile(r"""<(?:a|img)\b[^>]*?\b(?:href|src)\s*=\s*["'](https?://[^"']+)["']""", re.IGNORECASE)
+
+_store = None
+
+
+def prompt_key(prompt: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a prompt."""
+    return " ".join(_WORD.findall(prompt.lower()))
+
+
+def topic_terms(prompt: str) -> frozenset[str]:
+    """Words of the normalized prompt that name its topic."""
+    return frozenset(prompt_key(prompt).split()) - _FILLER
+
+
+def topic_overlap(a: str, b: str) -> float:
+    """Jaccard overlap of the topic words of two prompts (1.0 when neither has any)."""
+    terms_a, terms_b = topic_terms(a), topic_terms(b)
+    if not terms_a and not terms_b:
+        return 1.0
+    return len(terms_a & terms_b) / len(terms_a | terms_b)
+
+
+def sources_of(html: str) -> list[str]:
+    """Distinct URLs the blog links to or embeds, in order of appearance."""
+    return list(dict.fromkeys(_LINK.findall(html)))
+
+
+@dataclass
+class BlogMatch:
+    digest: str
+    prompt: str
+    created_at: float
+    sources: list[str]
+    score: float
+    html: str
+
+    def info(self) -> dict:
+        """JSON-friendly description of the hit, without the HTML."""
+        return {
+            "digest": self.digest,
+            "prompt": self.prompt,
+            "age_seconds": round(time.time() - self.created_at),
+            "score": round(self.score, 4),
+            "sources": self.sources,
+        }
+
+
+class BlogStore:
+    def __init__(self, directory: str = STORE_DIR, max_age: float = MAX_AGE, threshold: float = THRESHOLD,
+                 topic_overlap: float = TOPIC_OVERLAP):
+        from retrieval import MODEL_NAME
+
+        self.dir = Path(directory)
+        self.max_age = max_age
+        self.threshold = threshold
+        self.topic_overlap = topic_overlap
+        (self.dir / "objects").mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.dir / "index.sqlite3", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS blogs (
+                id INTEGER PRIMARY KEY,
+                prompt TEXT,
+                prompt_key TEXT,
+                digest TEXT,
+                created_at REAL,
+                sources TEXT,
+                chars INTEGER,
+                vector BLOB
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS blogs_key ON blogs (prompt_key, created_at)")
+        stored = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        if stored.get("model", MODEL_NAME) != MODEL_NAME:
+            logger.info(f"Embedding model changed to {MODEL_NAME}; dropping stored prompt vectors")
+            self._db.execute("UPDATE blogs SET vector = NULL")
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('model', ?)", (MODEL_NAME,))
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._vectors = None  # (ids, created_at, matrix), loaded on the first semantic lookup
+        self._embed_retry_at = 0.0  # monotonic time before which embedding is not retried
+        self.counts = {"hits": 0, "misses": 0}
+
+    def _object_path(self, digest: str) -> Path:
+        return self.dir / "objects" / digest[:2] / f"{digest}.html.z"
+
+    def _embed(self, prompt: str) -> np.ndarray | None:
+        import retrieval
+
+        if time.monotonic() < self._embed_retry_at:
+            return None
+        try:
+            return retrieval.embed_query(prompt)
+        except Exception as e:  # e.g. the model cannot be downloaded; exact matches still work
+            logger.warning(f"Prompt embedding failed, blog cache uses exact matches for {EMBED_RETRY:.0f}s: {e}")
+            self._embed_retry_at = time.monotonic() + EMBED_RETRY
+            return None
+
+    def put(self, prompt: str, html: str, sources: list[str] | None = None) -> str:
+        """Store ``html`` as the answer to ``prompt`` and return its content digest."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".tmp{os.getpid()}")
+            tmp.write_bytes(zlib.compress(data, 9))
+            tmp.replace(path)
+        vector = self._embed(prompt)
+        created_at = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO blogs (prompt, prompt_key, digest, created_at, sources, chars, vector) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (prompt, prompt_key(prompt), digest, created_at, json.dumps(sources or sources_of(html)),
+                 len(html), vector.tobytes() if vector is not None else None),
+            )
+            self._db.commit()
+            if self._vectors is not None and vector is not None:
+                ids, created, matrix = self._vectors
+                matrix = np.vstack([matrix, vector]) if ids else vector[np.newaxis, :]  # first row sets the width
+                self._vectors = (ids + [cursor.lastrowid], created + [created_at], matrix)
+        logger.info(f"Stored blog {digest[:12]} for prompt: {prompt[:80]}")
+        return digest
+
+    def get(self, digest: str) -> str:
+        return zlib.decompress(self._object_path(digest).read_bytes()).decode("utf-8")
+
+    def _load_vectors(self):
+        rows = self._db.execute("SELECT id, created_at, vector FROM blogs WHERE vector IS NOT NULL").fetchall()
+        if not rows:
+            return [], [], np.zeros((0, 0), dtype=np.float32)
+        matrix = np.stack([np.frombuffer(vector, dtype=np.float32) for _, _, vector in rows])
+        return [row[0] for row in rows], [row[1] for row in rows], matrix
+
+    def _match(self, row_id: int, score: float) -> BlogMatch | None:
+        with self._lock:
+            row = self._db.execute("SELECT digest, prompt, created_at, sources FROM blogs WHERE id = ?",
+                                   (row_id,)).fetchone()
+        try:
+            html = self.get(row[0])
+        except OSError:
+            logger.warning(f"Blog object {row[0]} is missing")
+            return None
+        return BlogMatch(row[0], row[1], row[2], json.loads(row[3]), score, html)
+
+    def lookup(self, prompt: str) -> BlogMatch | None:
+        """Most similar fresh blog for ``prompt``, or None."""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            exact = self._db.execute(
+                "SELECT id FROM blogs WHERE prompt_key = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (prompt_key(prompt), cutoff),
+            ).fetchone()
+        if exact is not None:
+            match = self._match(exact[0], 1.0)
+        else:
+            match = self._semantic(prompt, cutoff)
+        self.counts["hits" if match else "misses"] += 1
+        metrics.CACHE_LOOKUPS.labels("blogs", "hit" if match else "miss").inc()
+        return match
+
+    def _semantic(self, prompt: str, cutoff: float) -> BlogMatch | None:
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = self._load_vectors()
+            ids, created, matrix = self._vectors
+        fresh = [i for i, at in enumerate(created) if at >= cutoff]
+        if not fresh:
+            return None
+        query = self._embed(prompt)
+        if query is None or query.shape[0] != matrix.shape[1]:
+            return None
+        scores = matrix[fresh] @ query
+        numbers = set(_NUMBER.findall(prompt))
+        for position in np.argsort(-scores):
+            score = float(scores[position])
+            if score < self.threshold:
+                break
+            match = self._match(ids[fresh[position]], score)
+            if (match is not None and set(_NUMBER.findall(match.prompt)) == numbers
+                    and topic_overlap(prompt, match.prompt) >= self.topic_overlap):
+                return match
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, blogs, chars = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT digest), COALESCE(SUM(chars), 0) FROM blogs"
+            ).fetchone()
+        stored = sum(path.stat().st_size for path in (self.dir / "objects").glob("*/*.html.z"))
+        return {**self.counts, "entries": entries, "blogs": blogs, "html_chars": chars, "stored_bytes": stored}
+
+
+def get_store() -> BlogStore:
+    global _store
+    if _store is None:
+        _store = BlogStore()
+    return _store
+
+
+async def lookup(prompt: str) -> BlogMatch | None:
+    """Cached blog for ``prompt`` (None when disabled, on a miss or on any store error)."""
+    if not ENABLED:
+        return None
+    try:
+        return await asyncio.to_thread(get_store().lookup, prompt)
+    except Exception as e:
+        logger.warning(f"Blog cache lookup failed: {e}")
+        return None
+
+
+async def remember(prompt: str, response: str) -> str | None:
+    """Store the agent's response to ``prompt`` if it is a blog. Returns the digest, if stored."""
+    if not ENABLED or not is_blog(response):
+        return None
+    try:
+        return await asyncio.to_thread(get_store().put, prompt, extract_html(response))
+    except Exception as e:
+        logger.warning(f"Storing blog failed: {e}")
+        return None
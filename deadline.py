@@ -0,0 +1,36 @@
+# deadline.py
+"""Per-tool-call time budgets.
+
+A tool call opens ``budget(seconds)``; everything it awaits (including tasks it
+spawns, which copy the context) can ask ``remaining()`` how much time is left and
+derive timeouts from it. Nested budgets can only tighten the deadline, never extend it.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# --- CONFIG ---
+TOOL_BUDGET = float(os.getenv("TOOL_BUDGET", "25"))  # seconds per tool call
+
+_deadline: ContextVar = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def budget(seconds: float = TOOL_BUDGET):
+    """Run the enclosed block with at most ``seconds`` left on the deadline."""
+    new = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: float = TOOL_BUDGET) -> float:
+    """Seconds left before the current deadline (``default`` when no budget is active)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
@@ -0,0 +1,164 @@
+# dedup.py
+"""Near-duplicate detection for search results and scraped pages.
+
+Each text gets a 64-bit SimHash over word 3-shingles. Fingerprints are kept in a
+small SQLite table and mirrored in a NumPy ``uint64`` array, so a lookup is one
+vectorized XOR + popcount over everything seen so far. Texts within
+``MAX_DISTANCE`` differing bits are treated as the same story.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from pageCache import normalize_url
+
+# --- CONFIG ---
+INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", ".cache/fingerprints.sqlite3")
+MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "100000"))
+MIN_CHARS = 300  # shorter texts fingerprint too noisily to compare
+
+_WORD = re.compile(r"\w+")
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle:
+        words = words + [""] * (shingle - len(words))
+    shingles = {" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles),
+    )
+    # Per bit position: +1 for every shingle hash with the bit set, -1 otherwise
+    votes = ((hashes[:, None] & _BITS) != 0).sum(axis=0) * 2 - len(hashes)
+    return int(_BITS[votes > 0].sum(dtype=np.uint64)) if (votes > 0).any() else 0
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class FingerprintIndex:
+    def __init__(self, path: str = INDEX_PATH, max_distance: int = MAX_DISTANCE):
+        self.max_distance = max_distance
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, simhash INTEGER, seen_at REAL)")
+        self._db.commit()
+        rows = self._db.execute("SELECT url, simhash FROM fingerprints ORDER BY seen_at").fetchall()
+        self._urls = [url for url, _ in rows]
+        self._hashes = np.array([h for _, h in rows], dtype=np.int64).view(np.uint64)
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def find(self, url: str, fingerprint: int) -> str | None:
+        """URL of a previously seen near-duplicate of ``fingerprint`` (other than ``url`` itself)."""
+        with self._lock:
+            hashes, urls = self._hashes, self._urls
+        if not len(hashes):
+            return None
+        distances = np.bitwise_count(hashes ^ np.uint64(fingerprint))
+        key = normalize_url(url)
+        for i in np.flatnonzero(distances <= self.max_distance):
+            if urls[i] != key:
+                return urls[i]
+        return None
+
+    def add(self, url: str, fingerprint: int):
+        with self._lock:
+            self._add(normalize_url(url), fingerprint)
+
+    def _add(self, key: str, fingerprint: int):
+        self._db.execute(
+            "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?)", (key, _to_signed(fingerprint), time.time())
+        )
+        # Replace rather than mutate the arrays so lock-free readers see a consistent snapshot
+        if key in self._urls:
+            i = self._urls.index(key)
+            self._hashes = self._hashes.copy()
+            self._hashes[i] = np.uint64(fingerprint)
+        else:
+            self._urls = self._urls + [key]
+            self._hashes = np.append(self._hashes, np.uint64(fingerprint))
+        if len(self._urls) > MAX_ENTRIES:
+            drop = len(self._urls) - MAX_ENTRIES
+            self._db.executemany("DELETE FROM fingerprints WHERE url = ?", [(u,) for u in self._urls[:drop]])
+            self._urls = self._urls[drop:]
+            self._hashes = self._hashes[drop:]
+        self._db.commit()
+
+    def stats(self) -> dict:
+        return {"fingerprints": len(self._urls), "duplicates": self.duplicates, "max_distance": self.max_distance}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> FingerprintIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FingerprintIndex()
+    return _index
+
+
+def check_page(url: str, text: str) -> str | None:
+    """Record a scraped page; return the URL it duplicates if it was seen before under another URL.
+
+    The index is shared by every session, so the caller may not have seen that URL itself.
+    """
+    if len(text) < MIN_CHARS or text.startswith("Error:"):
+        return None
+    index = get_index()
+    fingerprint = simhash(text)
+    original = index.find(url, fingerprint)
+    if original is not None:
+        index.duplicates += 1
+        logger.info(f"{url} is a near-duplicate of {original}")
+        return original
+    index.add(url, fingerprint)
+    return None
+
+
+def earlier_duplicates(texts: list[str]) -> list[int | None]:
+    """For each text, the position of an earlier near-duplicate in ``texts``, or None."""
+    max_distance = get_index().max_distance
+    seen, found = [], []
+    for text in texts:
+        if len(text) < MIN_CHARS or text.startswith("Error:"):
+            found.append(None)
+            continue
+        fingerprint = simhash(text)
+        found.append(next((i for i, h in seen if bin(fingerprint ^ h).count("1") <= max_distance), None))
+        seen.append((len(found) - 1, fingerprint))
+    return found
+
+
+def collapse(items: list, url_of, text_of) -> list:
+    """Drop items whose text nearly duplicates an earlier item in the list, recording the survivors."""
+    index = get_index()
+    kept, kept_hashes = [], []
+    for item in items:
+        text = text_of(item) or ""
+        if len(text) < MIN_CHARS:
+            kept.append(item)
+            continue
+        fingerprint = simhash(text)
+        if any(bin(fingerprint ^ h).count("1") <= index.max_distance for h in kept_hashes):
+            index.duplicates += 1
+            logger.info(f"Collapsed near-duplicate result {url_of(item)}")
+            continue
+        kept.append(item)
+        kept_hashes.append(fingerprint)
+        index.add(url_of(item), fingerprint)
+    return kept
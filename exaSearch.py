@@ -0,0 +1,178 @@
+# exaSearch.py
+"""Exa search with a TTL result cache and in-flight request coalescing.
+
+Results are cached by (normalized topic, num_results, start date). When several
+callers ask for the same search while it is still running they all await the
+same upstream request instead of each calling Exa.
+
+Set ``EXA_BASE_URL`` to point the client at a local fake Exa endpoint.
+"""
+import asyncio
+import dataclasses
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from blocking import run_blocking
+import deadline
+import fetcher
+import metrics
+import dedup
+import retrieval
+from pageCache import normalize_url
+
+# --- CONFIG ---
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai")
+CACHE_TTL = float(os.getenv("EXA_CACHE_TTL", "900"))  # seconds
+CACHE_MAX_ENTRIES = int(os.getenv("EXA_CACHE_MAX_ENTRIES", "256"))
+SEARCH_DAYS = 10
+MAX_CHARS_PER_RESULT = int(os.getenv("EXA_MAX_CHARS_PER_RESULT", "1200"))
+MAX_TOTAL_CHARS = int(os.getenv("EXA_MAX_TOTAL_CHARS", "6000"))
+
+_exa = None
+_cache = OrderedDict()  # key -> (stored_at, results)
+_inflight = {}  # key -> asyncio.Future
+stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+
+def get_exa():
+    """The Exa client, created on first search; importing exa_py pulls in the OpenAI SDK (~1s)."""
+    global _exa
+    if _exa is None:
+        from exa_py import Exa
+
+        _exa = Exa(os.getenv('EXA_API_KEY'), base_url=EXA_BASE_URL)
+    return _exa
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+def _search_upstream(topic: str, num_results: int, start_date: str):
+    """One Exa call; syndicated near-duplicates are collapsed once, before the response is cached."""
+    return _collapse(get_exa().search_and_contents(
+        topic,
+        text=True,
+        highlights=True,
+        start_published_date=start_date,
+        num_results=num_results
+    ))
+
+
+def _breaker() -> fetcher.CircuitBreaker:
+    return fetcher.get_breaker(urlsplit(EXA_BASE_URL).hostname or "exa")
+
+
+def _store(key, future: asyncio.Future):
+    """Settle one upstream call: the breaker counts it once, however many callers joined it."""
+    _inflight.pop(key, None)
+    if future.cancelled():
+        _breaker().release()
+        return
+    if future.exception() is not None:
+        metrics.count_error("exa", future.exception())
+        _breaker().failure()
+        return
+    _breaker().success()
+    results = future.result()
+    _cache[key] = (time.monotonic(), results)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+    for result in getattr(results, "results", []):
+        retrieval.index_later(result.url, result.text or "")
+
+
+async def search(topic: str, num_results: int = 5, days: int = SEARCH_DAYS):
+    """Search Exa for recent results, serving repeats from cache and merging concurrent duplicates."""
+    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    key = (normalize_topic(topic), num_results, start_date)
+
+    entry = _cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < CACHE_TTL:
+        _cache.move_to_end(key)
+        stats["hits"] += 1
+        metrics.CACHE_LOOKUPS.labels("search", "hit").inc()
+        return entry[1]
+
+    future = _inflight.get(key)
+    if future is None:
+        _breaker().check()
+        stats["misses"] += 1
+        metrics.CACHE_LOOKUPS.labels("search", "miss").inc()
+        future = asyncio.ensure_future(run_blocking(_search_upstream, topic, num_results, start_date))
+        future.add_done_callback(lambda f: _store(key, f))
+        _inflight[key] = future
+    else:
+        stats["coalesced"] += 1
+        metrics.CACHE_LOOKUPS.labels("search", "coalesced").inc()
+        logger.info(f"Joining in-flight Exa search for: {topic}")
+    # Shield so one cancelled or timed-out caller does not cancel the search for the others.
+    # A caller running out of time is not an upstream failure; _store judges the call itself.
+    try:
+        async with asyncio.timeout(deadline.remaining()):
+            response = await asyncio.shield(future)
+    except TimeoutError:
+        raise TimeoutError(f"Exa search for '{topic}' exceeded its time budget") from None
+    return response
+
+
+def _collapse(response):
+    """Drop syndicated near-duplicates from a search response."""
+    results = dedup.collapse(response.results, lambda r: r.url, lambda r: r.text)
+    return dataclasses.replace(response, results=results) if len(results) != len(response.results) else response
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:max(limit, 0)]
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "…"
+
+
+def compact_results(response, max_chars_per_result: int = MAX_CHARS_PER_RESULT,
+                    max_total_chars: int = MAX_TOTAL_CHARS) -> list[dict]:
+    """Title, URL, date, highlights and a truncated text per hit, within per-result and total character budgets."""
+    remaining = max_total_chars
+    compact = []
+    for result in response.results:
+        if remaining <= 0:
+            break
+        budget = min(max_chars_per_result, remaining)
+        highlights = []
+        for highlight in result.highlights or []:
+            if len(highlight) > budget // 2:
+                continue
+            highlights.append(highlight)
+            budget -= len(highlight)
+        text = result.text or ""
+        snippet = _truncate(text, budget)
+        compact.append({
+            "title": result.title,
+            "url": result.url,
+            "published_date": result.published_date,
+            "highlights": highlights,
+            "text": snippet,
+            "truncated": len(snippet) < len(text),
+        })
+        remaining -= sum(len(h) for h in highlights) + len(snippet)
+    return compact
+
+
+def find_result(url: str):
+    """Full search hit for ``url`` from any cached search response, or None."""
+    key = normalize_url(url)
+    for _, response in reversed(_cache.values()):
+        for result in response.results:
+            if normalize_url(result.url) == key:
+                return result
+    return None
+
+
+def cache_stats() -> dict:
+    return {**stats, "entries": len(_cache), "in_flight": len(_inflight), "ttl_seconds": CACHE_TTL}
@@ -1,25 +1,45 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from contextlib import aclosing, asynccontextmanager
 import asyncio
+import json
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from mcp_use import MCPAgent, MCPClient
+from agentEvents import progress, stream_run
+from agentPool import AgentPool
+from blogPipeline import BlogPipeline
+from jobQueue import JobQueue
+import blogStore
+import llmRouter
+import metrics
+from pathlib import Path
 import os
 
 load_dotenv()
 os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
 
+# MCP server config; the offline benchmark points this at a local SSE server
+MCP_CONFIG = os.getenv("MCP_CONFIG", "newsCrawler.json")
+# "agent" (one MCPAgent walks the tools) or "pipeline" (outline, parallel sections; see blogPipeline.py)
+BLOG_MODE = os.getenv("BLOG_MODE", "agent")
+
 # Declare globals
-agent = None
+pool = None
 client = None
+jobs = None
+pipeline = None
+
+def make_llm(planner: str = llmRouter.PLANNER_MODELS):
+    """Chat model shared by every session (replaced by a scripted fake in benchmarks/bench_e2e.py)."""
+    return llmRouter.make_router(planner=planner)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global agent, client
+    global pool, client, jobs, pipeline
     print("Starting up...")
 
-    config_file = "newsCrawler.json"
+    config_file = MCP_CONFIG
     system_prompt = """
 You are an AI research assistant and professional blog writer. Your task is to create high-quality, well-researched, original blog posts in **HTML format with embedded CSS styling**.
 
@@ -71,45 +91,245 @@ Your output must follow these guidelines:
 </html>
 """
     client = MCPClient.from_config_file(config_file)
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-04-17")
+    llm = make_llm()
+
+    def make_agent(client):
+        return MCPAgent(
+            llm=llm,
+            client=client,
+            system_prompt=system_prompt,
+            max_steps=15,
+            memory_enabled=True,
+            verbose=True
+        )
+
+    # One agent (and conversation memory) per session, all sharing the client's MCP sessions
+    pool = AgentPool(client, make_agent)
+    await pool.start()
+    # The fan-out pipeline calls the same MCP sessions directly. Its calls never use tools, so
+    # they go straight to the writer models; a planner tier would only answer to be discarded.
+    pipeline = BlogPipeline(client, make_llm(planner=""))
+
+    # Background blog jobs run on their own throwaway sessions in the same pool
+    async def run_job(job_id, prompt, on_progress):
+        match = await blogStore.lookup(prompt)
+        if match is not None:
+            on_progress(f"served from blog cache ({match.digest[:12]})")
+            return match.html
+        if BLOG_MODE == "pipeline":
+            async with pool.slot():
+                response = await pipeline.run(prompt, on_progress)
+            await blogStore.remember(prompt, response)
+            return response
+        session_id = f"job-{job_id}"
+        try:
+            async with aclosing(stream_run(lambda: pool.run(session_id, prompt))) as stream:
+                async for event in stream:
+                    if event["type"] == "tool_start":
+                        on_progress(f"calling {event['tool']}")
+                    elif event["type"] == "error":
+                        raise RuntimeError(event["error"])
+                    elif event["type"] == "result":
+                        await blogStore.remember(prompt, event["response"])
+                        return event["response"]
+        finally:
+            pool.clear(session_id)
 
-    agent = MCPAgent(
-        llm=llm,
-        client=client,
-        system_prompt=system_prompt,
-        max_steps=15,
-        memory_enabled=True,
-        verbose=True
-    )
+    jobs = JobQueue(run_job)
+    jobs.start()
 
     yield  # app is ready
 
     print("Shutting down...")
+    await jobs.stop()
     if client and client.sessions:
         await client.close_all_sessions()
 
 app = FastAPI(lifespan=lifespan)
 
 
+def session_id_for(request: Request, data: dict) -> str:
+    """Session ID from the JSON body or the X-Session-ID header; clients without one share "default"."""
+    return data.get("session_id") or request.headers.get("X-Session-ID") or "default"
+
+
+def is_opening(session_id: str) -> bool:
+    """Whether the next message starts the session's conversation.
+
+    Only opening requests are looked up in, and stored to, the blog cache: later messages
+    ("add a section on the cast") only make sense with the conversation before them.
+    """
+    stats = pool.session_stats(session_id)
+    return not (stats and stats["turns"])
+
+
+async def cached_blog(session_id: str, user_input: str, data: dict):
+    """A stored blog answering the first message of a session, recorded in the session's memory.
+
+    ``"use_cache": false`` in the body always runs the agent.
+    """
+    if data.get("use_cache") is False or not is_opening(session_id):
+        return None
+    match = await blogStore.lookup(user_input)
+    if match is not None:
+        pool.get(session_id).memory.record(user_input, match.html)
+    return match
+
+
+def use_pipeline(session_id: str, data: dict) -> bool:
+    """Whether to answer with the fan-out pipeline: ``"mode": "pipeline"`` (or BLOG_MODE) on an opening
+    message. The pipeline has no conversation memory, so follow-ups always go to the session's agent."""
+    return data.get("mode", BLOG_MODE) == "pipeline" and is_opening(session_id)
+
+
+async def run_pipeline(session_id: str, user_input: str, on_progress=lambda message: None) -> str:
+    """Generate with the pipeline and record the exchange, so the session's agent can revise it.
+
+    A run holds one of the pool's slots, so pipelines and agent runs share one concurrency bound.
+    """
+    async with pool.slot():
+        response = await pipeline.run(user_input, on_progress)
+    pool.get(session_id).memory.record(user_input, response)
+    return response
+
+
 @app.post("/chat")
 async def chat_endpoint(request: Request):
     data = await request.json()
     user_input = data.get("message")
+    session_id = session_id_for(request, data)
 
     if not user_input:
         return JSONResponse(content={"error": "No message provided"}, status_code=400)
 
     try:
-        response = await agent.run(user_input)
-        return JSONResponse(content={"response": response})
+        opening = is_opening(session_id)
+        match = await cached_blog(session_id, user_input, data)
+        if match is not None:
+            return JSONResponse(content={"response": match.html, "session_id": session_id, "cached": match.info()})
+        if use_pipeline(session_id, data):
+            response = await run_pipeline(session_id, user_input)
+        else:
+            response = await pool.run(session_id, user_input)
+        if opening:
+            await blogStore.remember(user_input, response)
+        return JSONResponse(content={"response": response, "session_id": session_id})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: Request):
+    """Like /chat, but streams tool calls and response tokens as server-sent events."""
+    data = await request.json()
+    user_input = data.get("message")
+    session_id = session_id_for(request, data)
+
+    if not user_input:
+        return JSONResponse(content={"error": "No message provided"}, status_code=400)
+
+    async def events():
+        yield f"event: session\ndata: {json.dumps({'session_id': session_id})}\n\n"
+        try:
+            opening = is_opening(session_id)
+            match = await cached_blog(session_id, user_input, data)
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            return
+        if match is not None:
+            event = {"type": "result", "response": match.html, "cached": match.info()}
+            yield f"event: result\ndata: {json.dumps(event)}\n\n"
+            return
+        if use_pipeline(session_id, data):
+            run = lambda: run_pipeline(session_id, user_input, progress)
+        else:
+            run = lambda: pool.run(session_id, user_input)
+        # aclosing closes stream_run as soon as we leave the loop, which cancels the agent run
+        async with aclosing(stream_run(run)) as stream:
+            async for event in stream:
+                if await request.is_disconnected():
+                    break
+                if event["type"] == "ping":
+                    yield ": ping\n\n"
+                else:
+                    if event["type"] == "result" and opening:
+                        await blogStore.remember(user_input, event["response"])
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 @app.post("/clear")
-async def clear_endpoint():
-    agent.clear_conversation_history()
-    return JSONResponse(content={"message": "Conversation history cleared"})
+async def clear_endpoint(request: Request):
+    body = await request.body()
+    session_id = session_id_for(request, json.loads(body) if body else {})
+    pool.clear(session_id)
+    return JSONResponse(content={"message": "Conversation history cleared", "session_id": session_id})
+
+
+@app.post("/jobs")
+async def create_jobs_endpoint(request: Request):
+    """Queue blog jobs: a JSON object with "topic" or "message", or a JSONL batch of them
+    (Content-Type application/x-ndjson or application/jsonl)."""
+    body = (await request.body()).decode("utf-8")
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = [json.loads(body)]
+        prompts = [item.get("message") or f"Write a blog on {item['topic']}" for item in items]
+    except (ValueError, KeyError, AttributeError):
+        return JSONResponse(content={"error": "Expected {\"topic\": ...} or {\"message\": ...} per job"}, status_code=400)
+
+    if not prompts:
+        return JSONResponse(content={"error": "No jobs provided"}, status_code=400)
+
+    batch_id, job_ids = jobs.submit(prompts)
+    return JSONResponse(content={"batch_id": batch_id, "job_ids": job_ids}, status_code=202)
+
+
+@app.get("/jobs/{job_id}")
+async def job_endpoint(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Unknown job"}, status_code=404)
+    if job["status"] == "done":
+        job["result"] = Path(job["result_path"]).read_text(encoding="utf-8")
+    return JSONResponse(content=job)
+
+
+@app.get("/batches/{batch_id}")
+async def batch_endpoint(batch_id: str):
+    batch = jobs.batch(batch_id)
+    if not batch:
+        return JSONResponse(content={"error": "Unknown batch"}, status_code=404)
+    return JSONResponse(content={"batch_id": batch_id, "jobs": batch})
+
+
+@app.get("/sessions")
+async def sessions_endpoint():
+    return JSONResponse(content=pool.stats())
+
+
+@app.get("/sessions/{session_id}")
+async def session_endpoint(session_id: str):
+    stats = pool.session_stats(session_id)
+    if stats is None:
+        return JSONResponse(content={"error": "Unknown session"}, status_code=404)
+    return JSONResponse(content=stats)
+
+
+@app.get("/llm")
+async def llm_endpoint():
+    """Rolling latency, error rate and circuit state of each routed model."""
+    return JSONResponse(content=llmRouter.route_stats())
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
 
 if __name__ == "__main__":
     import uvicorn
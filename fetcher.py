@@ -0,0 +1,267 @@
+# fetcher.py
+"""Shared async HTTP client used by the MCP web tools.
+
+A single pooled ``httpx.AsyncClient`` is kept per event loop so connections stay
+alive between tool calls, and compressed responses (gzip, and brotli when the
+``brotli`` package is installed) are negotiated and decoded transparently.
+Concurrency is capped both globally and per host.
+
+Every request is bounded by the caller's deadline (see ``deadline``): connect and
+read timeouts are derived from the time left, transient failures are retried with
+jittered exponential backoff only while the budget allows another attempt, and a
+per-host circuit breaker fast-fails hosts that keep timing out.
+"""
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+import deadline
+import metrics
+
+# --- CONFIG ---
+MAX_CONCURRENCY = int(os.getenv("FETCH_MAX_CONCURRENCY", "16"))
+MAX_PER_HOST = int(os.getenv("FETCH_MAX_PER_HOST", "4"))
+TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "20"))  # used when no tool budget is active
+CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("FETCH_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", "2"))
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 4.0
+MIN_ATTEMPT_SECONDS = 1.0  # don't start an attempt with less time than this left
+BREAKER_THRESHOLD = int(os.getenv("FETCH_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("FETCH_BREAKER_COOLDOWN", "60"))
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+RETRY_STATUSES = {429, 502, 503, 504}
+_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+_client = None
+_loop = None
+_retiring = set()  # aclose() tasks of clients left behind by a previous loop
+_global_slots = None
+_host_slots = {}
+_breakers = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures; lets one trial through after ``cooldown``."""
+
+    def __init__(self, host: str, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def check(self):
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial_running):
+            retry_in = self.cooldown - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"{self.host} keeps failing; skipping it for another {max(retry_in, 0):.0f}s")
+        if state == "half-open":
+            self.trial_running = True
+
+    def release(self):
+        """End a half-open trial without a verdict (e.g. it was cancelled), so another may run."""
+        self.trial_running = False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def failure(self):
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit opened for {self.host} after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it for the running event loop if needed."""
+    global _client, _loop, _global_slots
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _loop is not loop:
+        if _client is not None and not _client.is_closed:
+            _retire(_client, _loop)
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENCY,
+                max_keepalive_connections=MAX_CONCURRENCY,
+            ),
+        )
+        _loop = loop
+        _global_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+        _host_slots.clear()
+    return _client
+
+
+def _retire(client: httpx.AsyncClient, loop):
+    """Close the client of a previous event loop: on that loop if it still runs, else on this one."""
+    if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    task = asyncio.ensure_future(client.aclose())
+    _retiring.add(task)
+    task.add_done_callback(_retiring.discard)
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+def _host_slot(url: str) -> asyncio.Semaphore:
+    host = _host(url)
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = asyncio.Semaphore(MAX_PER_HOST)
+    return slot
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def _timeouts(remaining: float) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=min(CONNECT_TIMEOUT, remaining),
+        read=min(READ_TIMEOUT, remaining),
+        write=min(READ_TIMEOUT, remaining),
+        pool=remaining,
+    )
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+async def _send(url: str, headers: dict | None, stream: bool) -> httpx.Response:
+    """Send a GET, retrying transient failures while the deadline leaves room for another attempt."""
+    client = get_client()
+    attempt = 0
+    while True:
+        remaining = deadline.remaining(TIMEOUT)
+        if remaining <= 0:
+            raise httpx.TimeoutException(f"Deadline exceeded before fetching {url}")
+        request = client.build_request("GET", url, headers=headers, timeout=_timeouts(remaining))
+        try:
+            response = await client.send(request, stream=stream)
+        except _RETRY_ERRORS as e:
+            error, response = e, None
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            error = httpx.HTTPStatusError(f"{response.status_code} from {url}", request=request, response=response)
+        delay = _backoff(attempt)
+        if attempt >= MAX_RETRIES or deadline.remaining(TIMEOUT) < delay + MIN_ATTEMPT_SECONDS:
+            if response is not None:
+                return response  # let the caller see the final status
+            raise error
+        if response is not None:
+            await response.aclose()
+        attempt += 1
+        logger.info(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1}): {error}")
+        await asyncio.sleep(delay)
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500 or response.status_code == 429
+
+
+async def fetch(url: str, headers: dict | None = None) -> httpx.Response:
+    """GET a URL through the shared client within the current deadline."""
+    breaker = get_breaker(_host(url))
+    breaker.check()
+    get_client()
+    try:
+        async with asyncio.timeout(deadline.remaining(TIMEOUT)):
+            async with _global_slots, _host_slot(url):
+                response = await _send(url, headers, stream=False)
+    except (TimeoutError, httpx.RequestError):
+        breaker.failure()
+        raise
+    except BaseException:
+        breaker.release()  # cancelled or not the host's fault; don't leave a trial hanging
+        raise
+    breaker.failure() if _is_failure(response) else breaker.success()
+    metrics.FETCH_BYTES.inc(len(response.content))
+    logger.info(f"Fetched {url} ({response.status_code}, {len(response.content)} bytes)")
+    return response
+
+
+@asynccontextmanager
+async def stream(url: str, headers: dict | None = None):
+    """Open a streaming GET so the body can be read (and abandoned) chunk by chunk.
+
+    The global and per-host slots are held until the context exits, and reading the
+    body is bounded by the same deadline as the request. The breaker judges the host
+    by the response; errors raised after that, in the caller's block, don't count.
+    """
+    breaker = get_breaker(_host(url))
+    breaker.check()
+    get_client()
+    settled = False
+    try:
+        async with asyncio.timeout(deadline.remaining(TIMEOUT)):
+            async with _global_slots, _host_slot(url):
+                response = await _send(url, headers, stream=True)
+                settled = True
+                breaker.failure() if _is_failure(response) else breaker.success()
+                try:
+                    yield response
+                finally:
+                    await response.aclose()
+    except (TimeoutError, httpx.RequestError):
+        if not settled:
+            breaker.failure()
+        raise
+    except BaseException:
+        if not settled:
+            breaker.release()
+        raise
+
+
+async def fetch_many(urls: list[str]) -> list:
+    """Fetch several URLs concurrently. Results (or exceptions) come back in input order."""
+    return await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+
+
+def breaker_stats() -> dict:
+    """Hosts whose circuit is not closed, with their state and failure count."""
+    return {
+        host: {"state": breaker.state, "failures": breaker.failures}
+        for host, breaker in _breakers.items() if breaker.state != "closed" or breaker.failures
+    }
+
+
+async def aclose():
+    """Close the shared client and drop its connection pool."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,153 @@
+# htmlExtract.py
+"""Streaming, size-capped paragraph text extraction.
+
+``ParagraphExtractor`` is an incremental ``html.parser.HTMLParser`` that collects
+the text of ``<p>`` elements as chunks arrive instead of building a document tree.
+It stops once a character budget is reached so callers can stop reading the body.
+Image candidates (``og:image``/``twitter:image``, ``<img src>`` and the largest
+``srcset`` entry) are collected along the way, unresolved and in document order.
+
+Without a charset from the response headers the encoding is sniffed from a
+``<meta charset>`` (or ``http-equiv`` Content-Type) in the first chunk; unknown
+names fall back to UTF-8.
+"""
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+
+# --- CONFIG ---
+MAX_BYTES = int(os.getenv("EXTRACT_MAX_BYTES", str(4 * 1024 * 1024)))
+MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "50000"))
+CHUNK_SIZE = 16 * 1024
+MAX_IMAGES = int(os.getenv("EXTRACT_MAX_IMAGES", "20"))
+
+_SKIP_TAGS = {"script", "style", "template", "noscript"}
+_META_IMAGES = {"og:image", "og:image:url", "og:image:secure_url", "twitter:image", "twitter:image:src"}
+# Matches both <meta charset="x"> and <meta http-equiv="Content-Type" content="text/html; charset=x">
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([A-Za-z0-9_.:-]+)", re.IGNORECASE)
+
+
+def _decoder(encoding: str | None):
+    """Incremental decoder for ``encoding``, UTF-8 when it is missing or not a codec Python knows."""
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def sniff_charset(head: bytes) -> str | None:
+    """The charset a ``<meta>`` tag declares in the start of a document, if any."""
+    match = _META_CHARSET.search(head)
+    return match.group(1).decode("ascii") if match else None
+
+
+def largest_srcset(srcset: str) -> str | None:
+    """The candidate URL with the largest width (``800w``) or density (``2x``) descriptor."""
+    best, best_size = None, -1.0
+    for candidate in srcset.split(","):
+        parts = candidate.split()
+        if not parts:
+            continue
+        size = 1.0
+        if len(parts) > 1 and parts[1][-1:] in ("w", "x"):
+            try:
+                size = float(parts[1][:-1])
+            except ValueError:
+                pass
+        if size > best_size:
+            best, best_size = parts[0], size
+    return best
+
+
+class ParagraphExtractor(HTMLParser):
+    def __init__(self, encoding: str | None = None, max_chars: int = MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self._decoder = _decoder(encoding) if encoding else None
+        self.max_chars = max_chars
+        self.paragraphs = []
+        self.images = []
+        self._preferred = 0
+        self.chars = 0
+        self.done = False
+        self._current = None
+        self._skip = 0
+
+    def feed_bytes(self, chunk: bytes):
+        """Feed raw body bytes; decoding is incremental so multi-byte characters may span chunks."""
+        if self._decoder is None:
+            self._decoder = _decoder(sniff_charset(chunk))
+        if not self.done:
+            self.feed(self._decoder.decode(chunk))
+
+    def _add_image(self, src: str | None, first: bool = False):
+        src = (src or "").strip()
+        if not src or src.startswith("data:") or src in self.images or len(self.images) >= MAX_IMAGES:
+            return
+        if first:
+            self.images.insert(self._preferred, src)
+            self._preferred += 1
+        else:
+            self.images.append(src)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("img", "source", "meta"):
+            attrs = dict(attrs)
+            if tag == "meta":
+                if (attrs.get("property") or attrs.get("name") or "").lower() in _META_IMAGES:
+                    # The page's own choice of preview image goes first
+                    self._add_image(attrs.get("content"), first=True)
+            elif attrs.get("srcset"):
+                self._add_image(largest_srcset(attrs["srcset"]))
+            elif tag == "img":
+                self._add_image(attrs.get("src") or attrs.get("data-src"))
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "p":
+            # An unclosed <p> is implicitly closed by the next one
+            self._end_paragraph()
+            self._current = []
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "p" and self._current is not None:
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        if self._current is not None and not self._skip and not self.done:
+            self._current.append(data)
+
+    def _end_paragraph(self):
+        if self._current is None:
+            return
+        text = "".join(self._current)
+        self._current = None
+        remaining = self.max_chars - self.chars
+        if remaining <= 0:
+            self.done = True
+            return
+        if len(text) >= remaining:
+            text = text[:remaining]
+            self.done = True
+        self.paragraphs.append(text)
+        self.chars += len(text) + 1
+
+    def text(self) -> str:
+        """Finish parsing and return the joined paragraph text."""
+        if not self.done and self._decoder is not None:
+            self.feed(self._decoder.decode(b"", final=True))
+            self.close()
+        self._end_paragraph()
+        return "\n".join(self.paragraphs)
+
+
+def extract_text(content: bytes, encoding: str | None = None,
+                 max_bytes: int = MAX_BYTES, max_chars: int = MAX_CHARS) -> str:
+    """Extract paragraph text from an in-memory body, honouring the same budgets as streaming."""
+    extractor = ParagraphExtractor(encoding, max_chars)
+    for start in range(0, min(len(content), max_bytes), CHUNK_SIZE):
+        extractor.feed_bytes(content[start:min(start + CHUNK_SIZE, max_bytes)])
+        if extractor.done:
+            break
+    return extractor.text()
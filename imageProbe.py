@@ -0,0 +1,172 @@
+# imageProbe.py
+"""Image type and dimensions from the first bytes of the file.
+
+Each candidate is requested with a ``Range`` header and read only until its header
+(PNG, GIF, JPEG or WebP) yields the dimensions, so probing a page's images costs a
+few kilobytes each instead of full downloads. Definitive results (dimensions, or
+a response that is not a readable image) are cached in memory by URL; timeouts,
+open circuits, network errors and 5xx/429 responses are not, so the next page
+tries again. Concurrent probes of the same URL share one request.
+"""
+import asyncio
+import contextvars
+import os
+import struct
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from loguru import logger
+
+import deadline
+import fetcher
+import metrics
+
+# --- CONFIG ---
+PROBE_BYTES = int(os.getenv("IMAGE_PROBE_BYTES", str(64 * 1024)))  # JPEG EXIF blocks can push SOF this far
+PROBE_BUDGET = float(os.getenv("IMAGE_PROBE_BUDGET", "5"))  # seconds per probe
+MAX_PROBES = int(os.getenv("IMAGE_MAX_PROBES", "8"))  # candidates probed per page
+MAX_RESULTS = int(os.getenv("IMAGE_MAX_RESULTS", "5"))
+MIN_WIDTH = int(os.getenv("IMAGE_MIN_WIDTH", "200"))  # smaller images are icons, avatars or tracking pixels
+MIN_HEIGHT = int(os.getenv("IMAGE_MIN_HEIGHT", "120"))
+CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_PROBE_CACHE_ENTRIES", "4096"))
+
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass
+class ImageInfo:
+    url: str
+    type: str
+    width: int | None = None
+    height: int | None = None
+    bytes_read: int = 0
+
+
+def _jpeg_size(data: bytes) -> tuple[int, int] | None:
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:  # markers without a length
+            i += 2
+            continue
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def sniff(data: bytes) -> tuple[str, int, int] | None:
+    """``(type, width, height)`` from an image file's leading bytes, or None if not (yet) recognizable."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+    if data[:2] == b"\xff\xd8":
+        size = _jpeg_size(data)
+        return ("jpeg", *size) if size else None
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            b = data[21:25]
+            return "webp", 1 + (((b[1] & 0x3F) << 8) | b[0]), 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | (b[1] >> 6))
+        if chunk == b"VP8X":
+            return "webp", 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+    return None
+
+
+_cache: OrderedDict[str, ImageInfo | None] = OrderedDict()
+_inflight: dict[str, asyncio.Future] = {}
+
+
+async def _probe(url: str) -> ImageInfo | None:
+    with deadline.budget(PROBE_BUDGET):
+        async with fetcher.stream(url, headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"}) as response:
+            if response.status_code >= 500 or response.status_code == 429:
+                response.raise_for_status()  # transient; not a verdict on the image
+            if response.status_code not in (200, 206):
+                return None
+            content_type = response.headers.get("content-type", "").split(";")[0].strip()
+            data = bytearray()
+            # Servers that ignore Range send the whole file; stop reading as soon as the header is parsed
+            async for chunk in response.aiter_bytes(4096):
+                data += chunk
+                found = sniff(bytes(data))
+                if found:
+                    metrics.FETCH_BYTES.inc(len(data))
+                    return ImageInfo(url, found[0], found[1], found[2], len(data))
+                if len(data) >= PROBE_BYTES:
+                    break
+            metrics.FETCH_BYTES.inc(len(data))
+    if content_type.startswith("image/"):
+        # Recognized as an image (e.g. SVG or AVIF) but without dimensions we can read cheaply
+        return ImageInfo(url, content_type.removeprefix("image/"), bytes_read=len(data))
+    return None
+
+
+def _store(url: str, future: asyncio.Future):
+    _inflight.pop(url, None)
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        metrics.count_error("image_probe", future.exception())
+        logger.info(f"Image probe failed for {url}: {future.exception()!r}")
+        return
+    _cache[url] = future.result()
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+async def probe(url: str) -> ImageInfo | None:
+    """Type and dimensions of the image at ``url`` (None if it is not a readable image)."""
+    if url in _cache:
+        _cache.move_to_end(url)
+        metrics.CACHE_LOOKUPS.labels("images", "hit").inc()
+        return _cache[url]
+    future = _inflight.get(url)
+    if future is None:
+        metrics.CACHE_LOOKUPS.labels("images", "miss").inc()
+        # A fresh context gives the shared probe its own PROBE_BUDGET, not the first caller's remaining time
+        future = asyncio.create_task(_probe(url), context=contextvars.Context())
+        future.add_done_callback(lambda f: _store(url, f))
+        _inflight[url] = future
+    try:
+        async with asyncio.timeout(deadline.remaining(PROBE_BUDGET)):
+            return await asyncio.shield(future)
+    except Exception:
+        return None
+
+
+async def probe_many(urls: list[str]) -> list[ImageInfo]:
+    """Probe up to ``MAX_PROBES`` candidates concurrently and keep the usable ones, in candidate order.
+
+    Images at least ``MIN_WIDTH`` x ``MIN_HEIGHT`` come first; images whose dimensions
+    could not be read follow; smaller ones are dropped.
+    """
+    infos = [info for info in await asyncio.gather(*(probe(url) for url in urls[:MAX_PROBES])) if info]
+    sized = [i for i in infos if i.width is not None and i.width >= MIN_WIDTH and i.height >= MIN_HEIGHT]
+    unsized = [i for i in infos if i.width is None]
+    return (sized + unsized)[:MAX_RESULTS]
+
+
+def describe(infos: list[ImageInfo]) -> str:
+    """A short listing the agent can pick ``<img src>`` values from."""
+    lines = []
+    for info in infos:
+        size = f"{info.width}x{info.height} " if info.width is not None else ""
+        lines.append(f"- {info.url} ({size}{info.type})")
+    return "Images:\n" + "\n".join(lines) if lines else ""
+
+
+def cache_stats() -> dict:
+    return {"entries": len(_cache), "in_flight": len(_inflight)}
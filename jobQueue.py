@@ -0,0 +1,156 @@
+# jobQueue.py
+"""Background blog-generation jobs backed by SQLite.
+
+Jobs are persisted before they are acknowledged, so queued work survives a restart;
+jobs that were running when the process stopped are re-queued on startup. A fixed
+number of worker tasks pull jobs oldest-first, record progress as the agent calls
+tools, and write the finished HTML under ``results/``. A run whose answer is not an
+HTML document (e.g. "Agent stopped due to an error: ...") marks the job failed.
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from blogHtml import extract_html, is_blog
+
+# --- CONFIG ---
+DB_PATH = os.getenv("JOB_DB_PATH", "results/jobs.sqlite3")
+RESULTS_DIR = os.getenv("JOB_RESULTS_DIR", "results")
+WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+
+def slugify(text: str, max_len: int = 40) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:max_len] or "blog"
+
+
+class JobQueue:
+    """``runner(job_id, prompt, on_progress)`` generates one blog and returns the agent response."""
+
+    def __init__(
+        self,
+        runner: Callable[[str, str, Callable[[str], None]], Awaitable[str]],
+        db_path: str = DB_PATH,
+        results_dir: str = RESULTS_DIR,
+        workers: int = WORKERS,
+    ):
+        self.runner = runner
+        self.results_dir = Path(results_dir)
+        self.workers = workers
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                batch_id TEXT,
+                prompt TEXT,
+                status TEXT,
+                progress TEXT,
+                steps INTEGER DEFAULT 0,
+                result_path TEXT,
+                error TEXT,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        # Anything that was running when the process stopped starts over
+        requeued = self._db.execute(
+            "UPDATE jobs SET status = 'queued', progress = 'requeued after restart' WHERE status = 'running'"
+        ).rowcount
+        self._db.commit()
+        if requeued:
+            logger.info(f"Re-queued {requeued} interrupted jobs")
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, prompts: list[str]) -> tuple[str, list[str]]:
+        """Queue one job per prompt; returns ``(batch_id, job_ids)``."""
+        batch_id = uuid.uuid4().hex
+        job_ids = [uuid.uuid4().hex for _ in prompts]
+        now = time.time()
+        self._db.executemany(
+            "INSERT INTO jobs (id, batch_id, prompt, status, progress, created_at) VALUES (?, ?, ?, 'queued', 'queued', ?)",
+            [(job_id, batch_id, prompt, now + i * 1e-6) for i, (job_id, prompt) in enumerate(zip(job_ids, prompts))],
+        )
+        self._db.commit()
+        self._wakeup.set()
+        return batch_id, job_ids
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def batch(self, batch_id: str) -> list[dict]:
+        return [dict(row) for row in self._db.execute(
+            "SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)
+        )]
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+        self._db.commit()
+
+    def _claim(self) -> sqlite3.Row | None:
+        # Workers share the event loop thread, so select-then-update cannot race
+        row = self._db.execute(
+            "SELECT id, prompt FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            self._update(row["id"], status="running", progress="started", started_at=time.time())
+        return row
+
+    async def _worker(self, number: int):
+        while True:
+            row = self._claim()
+            if row is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._run(row["id"], row["prompt"])
+
+    async def _run(self, job_id: str, prompt: str):
+        logger.info(f"Job {job_id} started: {prompt[:80]}")
+        steps = 0
+
+        def on_progress(message: str):
+            nonlocal steps
+            steps += 1
+            self._update(job_id, progress=message, steps=steps)
+
+        try:
+            response = await self.runner(job_id, prompt, on_progress)
+            # mcp_use returns step failures ("Agent stopped due to an error: ...") as the answer
+            if not is_blog(response):
+                raise RuntimeError(f"Agent did not return an HTML blog: {response.strip()[:300] or '(empty)'}")
+            path = self.results_dir / f"{slugify(prompt)}-{job_id[:8]}.html"
+            path.write_text(extract_html(response), encoding="utf-8")
+            self._update(job_id, status="done", progress="done", result_path=str(path), finished_at=time.time())
+            logger.info(f"Job {job_id} finished: {path}")
+        except asyncio.CancelledError:
+            self._update(job_id, status="queued", progress="requeued after shutdown")
+            raise
+        except Exception as e:
+            self._update(job_id, status="failed", progress="failed", error=str(e), finished_at=time.time())
+            logger.warning(f"Job {job_id} failed: {e}")
+
+    def stats(self) -> dict:
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
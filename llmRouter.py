@@ -0,0 +1,313 @@
+# llmRouter.py
+"""Latency-aware routing of chat model calls across providers and models.
+
+``RouterChatModel`` is a LangChain chat model that forwards each call to one of
+several routes (``provider:model``, e.g. ``google:gemini-2.5-flash-preview-04-17`` or
+``groq:llama-3.3-70b-versatile``). Every route keeps a rolling window of its recent
+latencies and outcomes; calls go to the healthy route with the lowest expected
+latency (median divided by success rate, times one plus its consecutive failures).
+A route without samples is assumed to be as fast as the tier's median route
+(``LLM_ROUTER_PRIOR_SECONDS`` when no route has any yet), and a route that fails
+``LLM_ROUTER_FAILURES`` times in a row is skipped for ``LLM_ROUTER_COOLDOWN``
+seconds (the same circuit breaker the fetcher uses per host). A failed call falls
+over to the next route.
+
+With hedging on (``LLM_HEDGE=1``; off by default, since it can double paid calls),
+a call still running after the chosen route's p95 latency is sent to the next route
+as well, and whichever answers first wins; the other is cancelled.
+
+Two tiers: the planner routes (``LLM_PLANNER_MODELS``) drive the research steps. When
+a planner reply has no tool calls, the research is done, and the same messages go to
+the writer routes (``LLM_WRITER_MODELS``) for the final answer, so a cheap fast model
+can choose tools while a stronger one writes the HTML. Without planner routes, or
+when every planner route fails, the step uses the writer routes.
+
+Routes are shared per process by spec, so all agents and front ends in one process
+feed the same statistics. ``route_stats()`` reports them.
+"""
+import asyncio
+import os
+import statistics
+import time
+from collections import deque
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManager, CallbackManager
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from loguru import logger
+
+import metrics
+from agentEvents import QUIET_TAG
+from fetcher import CircuitBreaker, CircuitOpenError
+
+# --- CONFIG ---
+WRITER_MODELS = os.getenv("LLM_WRITER_MODELS", "google:gemini-2.5-flash-preview-04-17" + (
+    ",groq:llama-3.3-70b-versatile" if os.getenv("GROQ_API_KEY") else ""))
+PLANNER_MODELS = os.getenv("LLM_PLANNER_MODELS", "")  # empty: planning steps use the writer models
+HEDGE = os.getenv("LLM_HEDGE", "0") == "1"
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))  # latencies needed before a p95 is trusted
+WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))  # recent calls remembered per route
+FAILURE_THRESHOLD = int(os.getenv("LLM_ROUTER_FAILURES", "3"))
+COOLDOWN = float(os.getenv("LLM_ROUTER_COOLDOWN", "30"))
+PRIOR_SECONDS = float(os.getenv("LLM_ROUTER_PRIOR_SECONDS", "10"))  # assumed latency before any route has samples
+
+_routes = {}
+
+
+def _child_config(run_manager, manager_class, stream: bool = True) -> dict:
+    """Callbacks config that nests a route's model run under the router's run.
+
+    LLM run managers have no ``get_child``; this does what chain run managers do, so
+    event and metrics handlers see the real model call. Without ``stream`` the run is
+    tagged quiet, so calls whose answer may be discarded (planner replies, hedged
+    backups) send no tokens into the same output as the real one.
+    """
+    config = {} if stream else {"tags": [QUIET_TAG]}
+    if run_manager is None:
+        return config
+    manager = manager_class(handlers=[], parent_run_id=run_manager.run_id)
+    manager.set_handlers(run_manager.inheritable_handlers)
+    manager.add_tags(run_manager.inheritable_tags)
+    manager.add_metadata(run_manager.inheritable_metadata)
+    return {**config, "callbacks": manager}
+
+
+class RouteStats:
+    """Rolling latency and outcome window of one route, plus its circuit breaker."""
+
+    def __init__(self, name: str, window: int = WINDOW):
+        self.name = name
+        self.latencies = deque(maxlen=window)  # seconds, successful calls only
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.breaker = CircuitBreaker(name, FAILURE_THRESHOLD, COOLDOWN)
+        self.calls = 0
+        self.hedges = 0
+
+    def success(self, seconds: float):
+        self.calls += 1
+        self.latencies.append(seconds)
+        self.outcomes.append(True)
+        self.breaker.success()
+
+    def failure(self):
+        self.calls += 1
+        self.outcomes.append(False)
+        self.breaker.failure()
+
+    def abandoned(self):
+        """A hedged call that lost the race; neither a success nor a failure."""
+        self.breaker.release()
+
+    def quantile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state == "closed" or (self.breaker.state == "half-open" and not self.breaker.trial_running)
+
+    def median(self) -> float | None:
+        return statistics.median(self.latencies) if self.latencies else None
+
+    def expected_seconds(self, prior: float) -> float:
+        """Median latency (``prior`` until there is one) inflated by the error rate and consecutive failures."""
+        median = self.median()
+        return ((median if median is not None else prior) / max(1.0 - self.error_rate, 0.05)
+                * (1 + self.breaker.failures))
+
+    def hedge_delay(self, min_samples: int) -> float | None:
+        return self.quantile(0.95) if len(self.latencies) >= min_samples else None
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "route": self.name,
+            "calls": self.calls,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "state": self.breaker.state,
+            "hedges": self.hedges,
+        }
+
+
+class Route:
+    """A chat model (or the runnable ``bind_tools`` made from it) and the shared stats of its spec."""
+
+    def __init__(self, name: str, model, stats: RouteStats | None = None):
+        self.name = name
+        self.model = model
+        self.stats = stats or RouteStats(name)
+
+    def bind(self, model) -> "Route":
+        return Route(self.name, model, self.stats)
+
+
+class RouterChatModel(BaseChatModel):
+    writer: list[Any]
+    planner: list[Any] = []
+    hedge: bool = HEDGE
+    hedge_min_samples: int = HEDGE_MIN_SAMPLES
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": "router"}
+
+    def bind_tools(self, tools, **kwargs):
+        """Bind ``tools`` to every route's model; the bound routes keep feeding the same stats."""
+        return self.model_copy(update={
+            "writer": [route.bind(route.model.bind_tools(tools, **kwargs)) for route in self.writer],
+            "planner": [route.bind(route.model.bind_tools(tools, **kwargs)) for route in self.planner],
+        })
+
+    @staticmethod
+    def _ordered(routes: list[Route]) -> list[Route]:
+        """Healthy routes fastest first, then the rest as a last resort."""
+        medians = [m for m in (r.stats.median() for r in routes) if m is not None]
+        prior = statistics.median(medians) if medians else PRIOR_SECONDS
+        healthy = sorted((r for r in routes if r.stats.healthy), key=lambda r: r.stats.expected_seconds(prior))
+        return healthy + [r for r in routes if not r.stats.healthy]
+
+    async def _call(self, tier: str, route: Route, messages, stop, run_manager, stream: bool) -> AIMessage:
+        route.stats.breaker.check()
+        start = time.perf_counter()
+        try:
+            message = await route.model.ainvoke(
+                messages, stop=stop, config=_child_config(run_manager, AsyncCallbackManager, stream)
+            )
+        except asyncio.CancelledError:
+            route.stats.abandoned()
+            metrics.LLM_CALLS.labels(tier, route.name, "cancelled").inc()
+            raise
+        except Exception as e:
+            route.stats.failure()
+            metrics.LLM_CALLS.labels(tier, route.name, "error").inc()
+            metrics.count_error("llm_router", e)
+            raise
+        route.stats.success(time.perf_counter() - start)
+        metrics.LLM_CALLS.labels(tier, route.name, "ok").inc()
+        return message
+
+    async def _route(self, tier: str, routes: list[Route], messages, stop, run_manager, stream: bool) -> AIMessage:
+        """First answer from ``routes``, hedging and failing over; only the primary call may stream."""
+        candidates = self._ordered(routes)
+        errors = []
+        while candidates:
+            primary = candidates.pop(0)
+            backup = next((r for r in candidates if r.stats.healthy), None) if self.hedge else None
+            delay = primary.stats.hedge_delay(self.hedge_min_samples) if backup else None
+            tasks = {asyncio.ensure_future(self._call(tier, primary, messages, stop, run_manager, stream)): primary}
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    logger.info(f"{primary.name} slower than its p95 ({delay * 1000:.0f} ms); hedging with {backup.name}")
+                    primary.stats.hedges += 1
+                    metrics.LLM_CALLS.labels(tier, backup.name, "hedged").inc()
+                    candidates.remove(backup)
+                    tasks[asyncio.ensure_future(self._call(tier, backup, messages, stop, run_manager, False))] = backup
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        errors.append(f"{tasks[task].name}: {task.exception()}")
+            finally:
+                for task in tasks:
+                    task.cancel()
+        raise RuntimeError(f"Every {tier} model failed: " + "; ".join(errors))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.planner:
+            try:
+                # Not streamed: a reply without tool calls is discarded for the writer's
+                message = await self._route("planner", self.planner, messages, stop, run_manager, False)
+            except RuntimeError as e:
+                logger.warning(f"{e}; the writer models take this step")
+            else:
+                if message.tool_calls:
+                    return ChatResult(generations=[ChatGeneration(message=message)])
+                # The planner has finished researching; the writer produces the answer from the same context
+        message = await self._route("writer", self.writer, messages, stop, run_manager, True)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        """Synchronous calls fail over in order of expected latency, without hedging."""
+        for tier, routes in (("planner", self.planner), ("writer", self.writer)):
+            if not routes:
+                continue
+            errors = []
+            for route in self._ordered(routes):
+                try:
+                    route.stats.breaker.check()
+                except CircuitOpenError as e:
+                    errors.append(str(e))
+                    continue
+                start = time.perf_counter()
+                try:
+                    message = route.model.invoke(
+                        messages, stop=stop, config=_child_config(run_manager, CallbackManager, tier == "writer")
+                    )
+                except Exception as e:
+                    route.stats.failure()
+                    errors.append(f"{route.name}: {e}")
+                    continue
+                route.stats.success(time.perf_counter() - start)
+                break
+            else:
+                if tier == "planner":
+                    logger.warning(f"Every planner model failed: {'; '.join(errors)}; the writer models take this step")
+                    continue
+                raise RuntimeError(f"Every {tier} model failed: " + "; ".join(errors))
+            if tier == "writer" or message.tool_calls:
+                return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def make_chat_model(spec: str) -> BaseChatModel:
+    """Chat model for ``provider:model``; providers are imported on first use."""
+    provider, _, model = spec.partition(":")
+    if provider == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(model=model)
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(model=model)
+    raise ValueError(f"Unknown LLM provider in {spec!r} (expected google:<model> or groq:<model>)")
+
+
+def get_route(spec: str) -> Route:
+    """The process-wide route for ``spec``, so every front end shares its stats."""
+    route = _routes.get(spec)
+    if route is None:
+        route = _routes[spec] = Route(spec, make_chat_model(spec))
+    return route
+
+
+def _specs(value: str) -> list[str]:
+    return [spec.strip() for spec in value.split(",") if spec.strip()]
+
+
+def make_router(writer: str = WRITER_MODELS, planner: str = PLANNER_MODELS, hedge: bool = HEDGE) -> RouterChatModel:
+    return RouterChatModel(
+        writer=[get_route(spec) for spec in _specs(writer)],
+        planner=[get_route(spec) for spec in _specs(planner)],
+        hedge=hedge,
+    )
+
+
+def route_stats() -> list[dict]:
+    return [route.stats.snapshot() for route in _routes.values()]
@@ -1,15 +1,18 @@
 import asyncio
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from mcp_use import MCPAgent, MCPClient
+from memoryManager import BoundedMemory
+import blogStore
+import llmRouter
 import os
+import time
 load_dotenv()
 os.environ["GOOGLE_API_KEY"]=os.getenv("GEMINI_API_KEY")
 async def run_memory_chat():
     """Run a chat using MCPAgent's built-in conversation memory."""
 
-    # Config file path - change this to your config file
-    config_file = "newsCrawler.json"
+    # Config file path - change this to your config file (newsCrawlerDaemon.json attaches to the shared daemon)
+    config_file = os.getenv("MCP_CONFIG", "newsCrawler.json")
 
     print("Initializing chat...")
    
@@ -65,7 +68,7 @@ Your output must follow these guidelines:
 """
     # Create MCP client and agent with memory enabled
     client = MCPClient.from_config_file(config_file)
-    llm=llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-04-17")
+    llm = llmRouter.make_router()
 
     # Create agent with memory_enabled=True
     agent = MCPAgent(
@@ -76,12 +79,15 @@ Your output must follow these guidelines:
         memory_enabled=True,  
         verbose=True
     )
+    # Keep recent turns verbatim and summarize older ones within a token budget
+    memory = BoundedMemory(agent)
 
     print("\n===== Interactive MCP Chat =====")
     print("Type 'exit' or 'quit' to end the conversation")
     print("Type 'clear' to clear conversation history")
     print("==================================\n")
 
+    opening = True  # only an opening request can be answered from the blog cache
     try:
         # Main chat loop
         while True:
@@ -96,7 +102,8 @@ Your output must follow these guidelines:
 
             # Check for clear history command
             if user_input.lower() == "clear":
-                agent.clear_conversation_history()
+                memory.clear()
+                opening = True
                 print("Conversation history cleared.")
                 continue
 
@@ -104,9 +111,21 @@ Your output must follow these guidelines:
             print("\nAssistant: ", end="", flush=True)
 
             try:
-                # Run the agent with the user input (memory handling is automatic)
-                response = await agent.run(user_input)
+                # An opening request may already have a fresh blog in the store
+                first, opening = opening, False
+                match = await blogStore.lookup(user_input) if first else None
+                if match is not None:
+                    memory.record(user_input, match.html)
+                    print(match.html)
+                    print(f"\n[From blog cache: '{match.prompt}', similarity {match.score:.2f}, "
+                          f"{(time.time() - match.created_at) / 60:.0f} min old]")
+                    continue
+
+                # Run the agent with the user input (memory is compacted to the budget first)
+                response = await memory.run(user_input)
                 print(response)
+                if first:  # follow-ups only make sense with the conversation before them
+                    await blogStore.remember(user_input, response)
 
             except Exception as e:
                 print(f"\nError: {e}")
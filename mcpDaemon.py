@@ -0,0 +1,280 @@
+# mcpDaemon.py
+"""Persistent shared MCP server that front ends attach to over a local socket.
+
+Spawning ``mcpServer.py`` per client pays the interpreter and import cost every time
+and starts with cold in-memory caches (Exa results, image probes, prefetches, the
+HTTP connection pool). Instead, one long-lived daemon serves the same tools to any
+number of MCP sessions, one per socket connection, all sharing that warm state.
+
+Front ends keep their stdio config but launch the tiny ``attach`` bridge instead of
+the server (see ``newsCrawlerDaemon.json``). The bridge pipes stdin/stdout to the
+daemon socket, starting the daemon first if it is not running, and imports nothing
+heavy, so it is ready in a few tens of milliseconds.
+
+    python mcpDaemon.py serve    # run the daemon in the foreground
+    python mcpDaemon.py attach   # stdio <-> daemon bridge (what MCP clients launch)
+    python mcpDaemon.py stop
+
+The daemon listens on the Unix socket ``MCP_DAEMON_SOCKET`` (default
+``.cache/mcp-daemon.sock``) or, on Windows or when that is set empty, on
+``127.0.0.1:MCP_DAEMON_PORT``. It exits after ``MCP_DAEMON_IDLE_SECONDS`` without
+clients (0 keeps it running).
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# --- CONFIG ---
+SOCKET_PATH = os.getenv("MCP_DAEMON_SOCKET", "" if os.name == "nt" else ".cache/mcp-daemon.sock")
+PORT = int(os.getenv("MCP_DAEMON_PORT", "8765"))
+IDLE_SECONDS = float(os.getenv("MCP_DAEMON_IDLE_SECONDS", "1800"))
+START_TIMEOUT = float(os.getenv("MCP_DAEMON_START_TIMEOUT", "60"))
+LOG_FILE = ROOT / ".cache" / "mcp-daemon.log"
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+def _socket_path() -> Path | None:
+    return (ROOT / SOCKET_PATH) if SOCKET_PATH else None
+
+
+def _pid_file() -> Path:
+    path = _socket_path()
+    return path.with_suffix(".pid") if path is not None else ROOT / ".cache" / f"mcp-daemon-{PORT}.pid"
+
+
+def _lock_daemon():
+    """Hold an exclusive lock for this daemon's lifetime; None if another daemon holds it.
+
+    Two ``attach`` calls can start daemons at the same moment; without the lock, the later
+    one would replace the other's socket. Windows binds a TCP port, which is exclusive anyway.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return open(os.devnull)
+    path = _pid_file().with_suffix(".lock")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock = open(path, "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def _same_file(path: Path, inode: int | None) -> bool:
+    try:
+        return path.stat().st_ino == inode
+    except OSError:
+        return False
+
+
+def connect() -> socket.socket:
+    """Connect to a running daemon (raises OSError if none is listening)."""
+    path = _socket_path()
+    if path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    return socket.create_connection(("127.0.0.1", PORT))
+
+
+def start_daemon() -> subprocess.Popen:
+    """Launch the daemon detached from this process, logging to ``.cache/mcp-daemon.log``."""
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    log = open(LOG_FILE, "ab")
+    if os.name == "nt":
+        detach = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        detach = {"start_new_session": True}
+    return subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "serve"], cwd=ROOT,
+                            stdin=subprocess.DEVNULL, stdout=log, stderr=log, **detach)
+
+
+def connect_or_start(timeout: float = START_TIMEOUT) -> socket.socket:
+    try:
+        return connect()
+    except OSError:
+        pass
+    start_daemon()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return connect()
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"MCP daemon did not start within {timeout:.0f}s; see {LOG_FILE}") from None
+            time.sleep(0.05)
+
+
+def attach():
+    """Bridge this process's stdin/stdout to a daemon session until either side closes."""
+    sock = connect_or_start()
+
+    def upstream():
+        try:
+            while data := os.read(sys.stdin.fileno(), 65536):
+                sock.sendall(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    threading.Thread(target=upstream, daemon=True).start()
+    out = sys.stdout.buffer
+    try:
+        while data := sock.recv(65536):
+            out.write(data)
+            out.flush()
+    except (OSError, ValueError):
+        pass
+    finally:
+        sock.close()
+
+
+async def _serve_connection(server, reader, writer):
+    """Run one MCP session over a socket connection (newline-delimited JSON-RPC, as over stdio)."""
+    import anyio
+    import mcp.types as types
+
+    read_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_reader = anyio.create_memory_object_stream(0)
+
+    async def pump_in():
+        async with read_writer:
+            while line := await reader.readline():
+                try:
+                    message = types.JSONRPCMessage.model_validate_json(line)
+                except Exception as exc:
+                    await read_writer.send(exc)
+                    continue
+                await read_writer.send(message)
+
+    async def pump_out():
+        async with write_reader:
+            async for message in write_reader:
+                writer.write(message.model_dump_json(by_alias=True, exclude_none=True).encode() + b"\n")
+                await writer.drain()
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(pump_in)
+            tg.start_soon(pump_out)
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+            tg.cancel_scope.cancel()
+    except (ConnectionError, anyio.ClosedResourceError, anyio.BrokenResourceError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve():
+    from loguru import logger
+
+    lock = _lock_daemon()
+    if lock is None:
+        logger.info("Another MCP daemon is running or starting")
+        return
+    with lock:
+        await _serve_locked(logger)
+
+
+async def _serve_locked(logger):
+    import asyncio
+
+    from mcpServer import mcp  # defines the tools; loads .env
+
+    path = _socket_path()
+    try:
+        connect().close()
+        logger.info("An MCP daemon is already running")
+        return
+    except OSError:
+        if path is not None and path.exists():
+            path.unlink()  # stale socket from a daemon that died
+
+    writers = set()
+    last_active = time.monotonic()
+
+    async def handle(reader, writer):
+        nonlocal last_active
+        writers.add(writer)
+        active = len(writers)
+        started = time.perf_counter()
+        logger.info(f"Client attached ({active} active)")
+        try:
+            await _serve_connection(mcp._mcp_server, reader, writer)
+        finally:
+            writers.discard(writer)
+            last_active = time.monotonic()
+            logger.info(f"Client detached after {time.perf_counter() - started:.1f}s ({len(writers)} active)")
+
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        server = await asyncio.start_unix_server(handle, str(path), limit=MAX_MESSAGE_BYTES)
+        inode = path.stat().st_ino
+    else:
+        server = await asyncio.start_server(handle, "127.0.0.1", PORT, limit=MAX_MESSAGE_BYTES)
+    stopping = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    except (NotImplementedError, AttributeError):  # Windows: terminated without cleanup
+        pass
+    pid_file = _pid_file()
+    pid_file.parent.mkdir(parents=True, exist_ok=True)
+    pid_file.write_text(str(os.getpid()))
+    logger.info(f"MCP daemon listening on {path or f'127.0.0.1:{PORT}'}")
+    try:
+        while not stopping.is_set():
+            try:
+                await asyncio.wait_for(stopping.wait(), min(IDLE_SECONDS, 30) if IDLE_SECONDS else 3600)
+            except TimeoutError:
+                pass
+            if IDLE_SECONDS and not writers and time.monotonic() - last_active > IDLE_SECONDS:
+                logger.info(f"No clients for {IDLE_SECONDS:.0f}s; shutting down")
+                break
+    finally:
+        server.close()
+        for writer in list(writers):
+            writer.close()
+        await server.wait_closed()
+        pid_file.unlink(missing_ok=True)
+        if path is not None and _same_file(path, inode):  # never remove a socket another daemon bound
+            path.unlink()
+
+
+def stop():
+    try:
+        pid = int(_pid_file().read_text())
+    except (OSError, ValueError):
+        print("No MCP daemon running")
+        return
+    os.kill(pid, signal.SIGTERM)
+    print(f"Stopped MCP daemon (pid {pid})")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "attach"
+    if command == "serve":
+        import asyncio
+
+        asyncio.run(serve())
+    elif command == "stop":
+        stop()
+    else:
+        attach()
@@ -1,11 +1,18 @@
-import asyncio
+import atexit
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from mcp_use import MCPAgent, MCPClient
 import os
-import nest_asyncio
-nest_asyncio.apply()
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Shared modules live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from agentPool import AgentPool
+from backgroundLoop import BackgroundLoop
+import llmRouter
 # Load environment variables
 load_dotenv()
 os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
@@ -23,6 +30,10 @@ if 'terminal_logs' not in st.session_state:
 if 'generated_html' not in st.session_state:
     st.session_state.generated_html = ""
 
+# Keys this browser session's agent (and its conversation memory) in the shared pool
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
 # Sidebar: Chat history + terminal logs
 with st.sidebar:
     st.header("📝 Chat History")
@@ -42,10 +53,10 @@ if st.session_state.generated_html:
 else:
     st.info("No blog content generated yet. Ask something to start!")
 
-# Text input at bottom
-user_input = st.text_input("💬 Type your message here", "")
+# Chat input at bottom; returns a message only on the rerun it was submitted in
+user_input = st.chat_input("💬 Type your message here")
 
-config_file = "../newsCrawler.json"
+config_file = os.getenv("MCP_CONFIG", "../newsCrawler.json")
 system_prompt = """
 You are an AI research assistant and professional blog writer. Your task is to create high-quality, well-researched, original blog posts in **HTML format with embedded CSS styling**.
 
@@ -69,61 +80,67 @@ Your output must follow these guidelines:
 4. Follow blogging best practices: clear introduction, logical subheadings, short paragraphs, good readability, conclusion.
 5. Ensure valid HTML structure.
 """
-# Initialize LLM and Agent
-client = MCPClient.from_config_file(config_file)
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-04-17")
-
-agent = MCPAgent(
-    llm=llm,
-    client=client,
-    system_prompt=system_prompt,
-    max_steps=15,
-    memory_enabled=True,
-    verbose=True
-)
-
-async def get_response(user_input):
-    """Async function to get agent's response."""
-    response = await agent.run(user_input)
-    return response
-
-def chat(user_input, history):
-    """Wrapper function for Gradio to handle async inside worker thread."""
-    if user_input.lower() in ["exit", "quit"]:
-        return history + [[user_input, "Session ended."]], history
-    elif user_input.lower() == "clear":
-        agent.clear_conversation_history()
-        return history + [[user_input, "Conversation history cleared."]], history
-
-    # 🔥 Create a new event loop inside the thread (fix)
-
-    
-    response = asyncio.get_event_loop().run_until_complete(get_response(user_input))
-
-    return response
 
-def run_agent_input(user_input,history):
-    
+@st.cache_resource
+def get_runtime():
+    """Event loop thread, MCP client, LLM and agent pool, created once per server process.
+
+    Streamlit reruns this script after every message; cached here, the MCP sessions
+    stay open between messages and across browser sessions, and each browser session
+    gets its own agent from the pool.
+    """
+    loop = BackgroundLoop()
+    client = MCPClient.from_config_file(config_file)
+    llm = llmRouter.make_router()
+
+    def make_agent(client):
+        return MCPAgent(
+            llm=llm,
+            client=client,
+            system_prompt=system_prompt,
+            max_steps=15,
+            memory_enabled=True,
+            verbose=True
+        )
+
+    pool = AgentPool(client, make_agent)
+    loop.run(pool.start())
+
+    def shutdown():
+        if client.sessions:
+            loop.run(client.close_all_sessions(), timeout=10)
+        loop.close()
+
+    atexit.register(shutdown)
+    return loop, pool
+
+
+def chat(user_input):
+    """Run one message on this browser session's agent and return the reply."""
+    if user_input.lower() in ["exit", "quit"]:
+        return "Session ended."
+    loop, pool = get_runtime()
+    if user_input.lower() == "clear":
+        # The pool belongs to the agent loop's thread; clear it there, between its callbacks
+        loop.loop.call_soon_threadsafe(pool.clear, st.session_state.session_id)
+        return "Conversation history cleared."
+    return loop.run(pool.run(st.session_state.session_id, user_input))
+
+def run_agent_input(user_input):
     try:
         st.session_state.terminal_logs.append("Starting agent execution...")
+        start = time.perf_counter()
+        response = chat(user_input)
+        st.session_state.terminal_logs.append(f"Agent response received in {time.perf_counter() - start:.1f}s.")
 
-        response = chat(user_input,history)
-        st.session_state.terminal_logs.append("Agent response received.")
-        
         # Save response
         st.session_state.chat_history.append({"user": user_input, "assistant": response})
         st.session_state.generated_html = response
-        
+
     except Exception as e:
         st.session_state.terminal_logs.append(f"Error: {str(e)}")
-    
-    finally:
-        if client and client.sessions:
-             client.close_all_sessions()
-        st.session_state.terminal_logs.append("Closed all client sessions.")
 
 # Handle user input
 if user_input:
-    run_agent_input(user_input,st.session_state.chat_history)
+    run_agent_input(user_input)
     st.rerun()  # refresh page to show updated chat
-
@@ -1,20 +1,26 @@
 # server.py
-import requests
-from bs4 import BeautifulSoup
+"""SSE MCP server for the container image (see Dockerfile).
+
+Run it from the repository root as a module so the shared tool modules import
+without path tweaks: ``python -m mcpServerDocker.server``.
+"""
 from loguru import logger
 from mcp.server.fastmcp import FastMCP
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from exa_py import Exa
 import os
+import uvicorn
+from starlette.responses import Response
+from starlette.routing import Route
 
 load_dotenv()
-exa = Exa(os.getenv('EXA_API_KEY'))
+
+import mcpTools
+import metrics
 
 # --- CONFIG ---
-HOST = "0.0.0.0"  # for SSE
-PORT = 8000
-TRANSPORT = "sse"  # change to "stdio" if needed
+HOST = os.getenv("MCP_HOST", "0.0.0.0")  # for SSE
+PORT = int(os.getenv("MCP_PORT", "8000"))
+TRANSPORT = os.getenv("MCP_TRANSPORT", "sse")  # change to "stdio" if needed
 
 # Create an MCP server with host/port
 mcp = FastMCP(
@@ -22,49 +28,20 @@ mcp = FastMCP(
     host=HOST,
     port=PORT
 )
+mcpTools.register(mcp)
 
-@mcp.tool(
-    name="exa_search_tool",
-    description="Performs a search using the Exa API and returns recent results with text and highlights.",
-)
-def exa_search_tool(topic: str, num_results: int = 5) -> str:
-    """
-    Perform a Google-like search using the Exa API and return the top search results with text and highlights.
-    Filters results to the last 10 days.
-    """
-    logger.info(f"Searching Exa API for topic: {topic} (top {num_results} results)")
-    try:
-        results = exa.search_and_contents(
-            topic,
-            text=True,
-            highlights=True,
-            start_published_date=(datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d'),
-            num_results=num_results
-        )
-        return results
-    except Exception as e:
-        return f"Error: {str(e)}"
 
-
-@mcp.tool(
-    name="webpage_scraper",
-    description="Scrapes and returns visible text content from the given webpage URL.",
-)
-def webpage_scraper(url: str) -> str:
-    """Scrape visible text from a webpage URL."""
-    logger.info(f"Scraping webpage: {url}")
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
-    try:
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.content, "html.parser")
-        paragraphs = [p.text for p in soup.find_all('p')]
-        return "\n".join(paragraphs)
-    except Exception as e:
-        return f"Error: {str(e)}"
+async def metrics_endpoint(request):
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
 
 
 if __name__ == "__main__":
     logger.info(f"Starting MCP server on {HOST}:{PORT} using transport '{TRANSPORT}'")
-    mcp.run(transport=TRANSPORT)
+    if TRANSPORT == "sse":
+        # Same app FastMCP would serve, plus a Prometheus scrape endpoint
+        app = mcp.sse_app()
+        app.router.routes.append(Route("/metrics", metrics_endpoint))
+        uvicorn.run(app, host=HOST, port=PORT)
+    else:
+        mcp.run(transport=TRANSPORT)
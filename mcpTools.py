@@ -0,0 +1,147 @@
+# mcpTools.py
+"""The web tools both MCP servers expose.
+
+``mcpServer.py`` (stdio) and ``mcpServerDocker/server.py`` (SSE) each create their
+own ``FastMCP`` and call ``register(mcp)``, so a tool is defined in one place.
+"""
+import json
+
+from loguru import logger
+from mcp.server.fastmcp import FastMCP
+
+import deadline
+import dedup
+import exaSearch
+import fetcher
+import imageProbe
+import metrics
+import retrieval
+import scraper
+import wikiDump
+from pageCache import get_cache
+
+
+def register(mcp: FastMCP):
+    """Add every web tool to ``mcp``."""
+
+    @mcp.tool(
+        name="exa_search_tool",
+        description=(
+            "Performs a search using the Exa API and returns recent results as JSON with title, url, date, "
+            "highlights and text truncated to a character budget. Use exa_expand_result for a hit's full text."
+        ),
+    )
+    @metrics.traced("mcp_tool")
+    async def exa_search_tool(
+        topic: str,
+        num_results: int = 5,
+        max_chars_per_result: int = exaSearch.MAX_CHARS_PER_RESULT,
+        max_total_chars: int = exaSearch.MAX_TOTAL_CHARS,
+    ) -> str:
+        """
+        Perform a Google-like search using the Exa API and return the top search results with text and highlights.
+        Filters results to the last 10 days. Repeated and concurrent identical searches are served from a shared cache.
+        """
+        logger.info(f"Searching Exa API for topic: {topic} (top {num_results} results)")
+        try:
+            with deadline.budget():
+                response = await exaSearch.search(topic, num_results)
+            results = exaSearch.compact_results(response, max_chars_per_result, max_total_chars)
+            # The agent usually scrapes the top hits next; start fetching them now
+            scraper.prefetch_pages([result["url"] for result in results])
+            return json.dumps({"query": topic, "results": results}, ensure_ascii=False)
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    @mcp.tool(
+        name="exa_expand_result",
+        description="Returns the full text of one search hit by URL, e.g. after exa_search_tool truncated it.",
+    )
+    @metrics.traced("mcp_tool")
+    async def exa_expand_result(url: str, max_chars: int = 20000) -> str:
+        """Full text of a previous search hit, falling back to scraping the page."""
+        logger.info(f"Expanding search result: {url}")
+        result = exaSearch.find_result(url)
+        if result is not None and result.text:
+            return result.text[:max_chars]
+        with deadline.budget():
+            return (await scraper.scrape(url, images=False))[:max_chars]
+
+    @mcp.tool(
+        name="webpage_scraper",
+        description=(
+            "Scrapes and returns visible text content from the given webpage URL, followed by the page's "
+            "usable images with their type and dimensions."
+        ),
+    )
+    @metrics.traced("mcp_tool")
+    async def webpage_scraper(url: str) -> str:
+        """Scrape visible text from a webpage URL."""
+        logger.info(f"Scraping webpage: {url}")
+        with deadline.budget():
+            return await scraper.scrape(url)
+
+    @mcp.tool(
+        name="webpage_scraper_batch",
+        description="Scrapes several webpage URLs concurrently and returns their visible text content in input order.",
+    )
+    @metrics.traced("mcp_tool")
+    async def webpage_scraper_batch(urls: list[str]) -> str:
+        """Scrape visible text from several webpage URLs at once."""
+        logger.info(f"Scraping {len(urls)} webpages")
+        with deadline.budget():
+            texts = await scraper.scrape_many(urls)
+        return json.dumps([{"url": url, "content": text} for url, text in zip(urls, texts)], ensure_ascii=False)
+
+    @mcp.tool(
+        name="scrape_wikipedia",
+        description=(
+            "Returns the Wikipedia article for a topic as JSON with title, url, lead summary and text truncated "
+            "to max_chars. Served from a local dump when one is configured."
+        ),
+    )
+    @metrics.traced("mcp_tool")
+    async def scrape_wikipedia(topic: str, max_chars: int = 4000) -> str:
+        """Look up a Wikipedia article, locally first and online as a fallback."""
+        logger.info(f"Looking up Wikipedia article: {topic}")
+        try:
+            with deadline.budget():
+                article = await wikiDump.article(topic)
+            if article is None:
+                return f"Error: no Wikipedia article found for '{topic}'"
+            return json.dumps({**article, "content": article["content"][:max_chars]}, ensure_ascii=False)
+        except TimeoutError:
+            return f"Error: timed out looking up '{topic}' on Wikipedia"
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    @mcp.tool(
+        name="retrieve_passages",
+        description="Returns the k passages most relevant to the query from everything searched or scraped so far.",
+    )
+    @metrics.traced("mcp_tool")
+    async def retrieve_passages(query: str, k: int = 5) -> str:
+        """Retrieve the top-k indexed passages for a query."""
+        logger.info(f"Retrieving {k} passages for: {query}")
+        if not retrieval.ENABLED:
+            return "Error: passage retrieval is disabled (set RETRIEVAL_ENABLED=1)"
+        try:
+            return json.dumps(await retrieval.retrieve(query, k), ensure_ascii=False)
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    @mcp.tool(
+        name="cache_stats",
+        description="Returns counters of the page and Exa search caches, the duplicate detector, tripped circuit breakers, page prefetching and image probes.",
+    )
+    @metrics.traced("mcp_tool")
+    def cache_stats() -> str:
+        """Report cache counters."""
+        return json.dumps({
+            "pages": get_cache().stats(),
+            "search": exaSearch.cache_stats(),
+            "dedup": dedup.get_index().stats(),
+            "breakers": fetcher.breaker_stats(),
+            "prefetch": scraper.prefetcher.stats(),
+            "images": imageProbe.cache_stats(),
+        })
@@ -0,0 +1,146 @@
+# memoryManager.py
+"""Token-budgeted conversation memory for ``MCPAgent``.
+
+``MCPAgent(memory_enabled=True)`` keeps every turn verbatim, so each new request
+resends all earlier blogs. ``BoundedMemory`` wraps an agent and, before each run,
+keeps the most recent turns verbatim and folds older turns into a rolling summary
+until the history fits the token budget. ``MCPAgent`` only stores the user query
+and the final answer of each run, so tool output never reaches the history; it is
+bounded where it is produced (``EXA_MAX_TOTAL_CHARS``, ``EXTRACT_MAX_CHARS``). Tokens
+are estimated at four characters each, which is close enough to size the budget.
+"""
+import os
+import re
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from loguru import logger
+from mcp_use import MCPAgent
+
+# --- CONFIG ---
+TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "8000"))
+KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", "2"))
+SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "1000"))
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a blog-writing assistant. "
+    "Update the summary with the new turns. Keep topics requested, key facts, sources and decisions; "
+    "drop HTML, styling and wording. Reply with the updated summary only."
+)
+
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_HEADING = re.compile(r"<h[12][^>]*>(.*?)</h[12]>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def estimate_tokens(messages: list[BaseMessage]) -> int:
+    return sum(len(str(message.content)) for message in messages) // 4
+
+
+def _is_summary(message: BaseMessage) -> bool:
+    return bool(message.additional_kwargs.get("memory_summary"))
+
+
+def digest_turn(turn: list[BaseMessage]) -> str:
+    """One or two lines describing a turn: the request and, for HTML answers, the title and headings."""
+    request = " ".join(str(m.content) for m in turn if isinstance(m, HumanMessage))[:200]
+    answer = str(turn[-1].content) if isinstance(turn[-1], AIMessage) else ""
+    if "<h1" in answer.lower() or "<title" in answer.lower():
+        title = _TITLE.search(answer)
+        headings = [_TAG.sub("", h).strip() for h in _HEADING.findall(answer)]
+        answer = f"wrote blog '{_TAG.sub('', title.group(1)).strip() if title else ''}' with sections: {'; '.join(headings)}"
+    else:
+        answer = " ".join(_TAG.sub("", answer).split())[:300]
+    return f"- User asked: {request}\n  Assistant: {answer}"
+
+
+class BoundedMemory:
+    """Wraps an agent so its conversation history stays within ``token_budget``.
+
+    If ``summarizer_llm`` is given, older turns are folded into the summary by the
+    model; otherwise an extractive digest (request, blog title and headings) is used.
+    """
+
+    def __init__(self, agent: MCPAgent, token_budget: int = TOKEN_BUDGET, keep_turns: int = KEEP_TURNS,
+                 summarizer_llm=None):
+        self.agent = agent
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summarizer_llm = summarizer_llm
+        self.summary = ""
+        self.turn = 0
+        self.prompt_sizes = []  # estimated prompt tokens (system + history + query) per turn
+
+    async def run(self, query: str, **kwargs) -> str:
+        await self.compact()
+        history = self.agent.get_conversation_history()
+        size = estimate_tokens(history) + len(query) // 4
+        self.turn += 1
+        self.prompt_sizes.append(size)
+        logger.info(f"Memory turn {self.turn}: ~{size} prompt tokens (budget {self.token_budget})")
+        return await self.agent.run(query, **kwargs)
+
+    def record(self, query: str, response: str):
+        """Add a turn answered without running the agent (e.g. from the blog cache) to the history."""
+        self.agent.add_to_history(HumanMessage(content=query))
+        self.agent.add_to_history(AIMessage(content=response))
+        self.turn += 1
+        self.prompt_sizes.append(0)
+
+    def clear(self):
+        self.agent.clear_conversation_history()
+        self.summary = ""
+
+    async def compact(self):
+        """Rewrite the agent's history in place to fit the budget."""
+        history = self.agent.get_conversation_history()
+        system = [m for m in history if isinstance(m, SystemMessage)]
+        turns = []
+        for message in history:
+            if isinstance(message, SystemMessage) or _is_summary(message):
+                continue
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+
+        folded = []
+        while len(turns) > 1 and (
+            len(turns) > self.keep_turns
+            and estimate_tokens(system + [m for t in turns for m in t]) + len(self.summary) // 4 > self.token_budget
+        ):
+            folded.append(turns.pop(0))
+        # Still over budget with only the kept turns: fold those too, newest always stays
+        while len(turns) > 1 and (
+            estimate_tokens(system + [m for t in turns for m in t]) + len(self.summary) // 4 > self.token_budget
+        ):
+            folded.append(turns.pop(0))
+        if folded:
+            await self._fold(folded)
+            logger.info(f"Folded {len(folded)} older turns into the conversation summary")
+
+        summary = []
+        if self.summary:
+            summary = [
+                HumanMessage(content=f"Summary of our earlier conversation:\n{self.summary}",
+                             additional_kwargs={"memory_summary": True}),
+                AIMessage(content="Understood.", additional_kwargs={"memory_summary": True}),
+            ]
+        history[:] = system + summary + [m for t in turns for m in t]
+
+    async def _fold(self, turns: list[list[BaseMessage]]):
+        digests = "\n".join(digest_turn(turn) for turn in turns)
+        if self.summarizer_llm is not None:
+            try:
+                reply = await self.summarizer_llm.ainvoke([
+                    SystemMessage(content=SUMMARY_PROMPT),
+                    HumanMessage(content=f"Current summary:\n{self.summary or '(none)'}\n\nNew turns:\n{digests}"),
+                ])
+                self.summary = str(reply.content).strip()
+            except Exception as e:
+                logger.warning(f"Summarizer failed, using extractive digest: {e}")
+                self.summary = f"{self.summary}\n{digests}".strip()
+        else:
+            self.summary = f"{self.summary}\n{digests}".strip()
+        # Keep the newest part of the summary if it outgrows its own budget
+        max_chars = SUMMARY_TOKENS * 4
+        if len(self.summary) > max_chars:
+            self.summary = self.summary[-max_chars:].split("\n", 1)[-1]
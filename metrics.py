@@ -0,0 +1,105 @@
+# metrics.py
+"""Prometheus metrics and timing spans shared by the MCP servers and front ends.
+
+Spans time agent runs and steps, LLM calls and tool calls into one histogram labelled
+by kind and name. Each finished span is also logged at DEBUG with its trace and parent
+ids, so a slow request can be followed through the log. Counters cover bytes fetched,
+HTML parse time, cache lookups and errors by type. ``render()`` returns the Prometheus
+text format for a ``/metrics`` endpoint.
+"""
+import functools
+import inspect
+import time
+import uuid
+from contextvars import ContextVar
+
+from loguru import logger
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+SPAN_SECONDS = Histogram(
+    "newscrawler_span_seconds", "Duration of agent runs and steps, LLM calls and tool calls",
+    ["kind", "name"], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+FETCH_BYTES = Counter("newscrawler_fetch_bytes_total", "Response body bytes read from the network")
+PARSE_SECONDS = Histogram(
+    "newscrawler_parse_seconds", "Time spent extracting text from one page",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_LOOKUPS = Counter("newscrawler_cache_lookups_total", "Cache lookups by cache and outcome", ["cache", "result"])
+PREFETCH = Counter("newscrawler_prefetch_total", "Speculative page prefetches by outcome", ["result"])
+ERRORS = Counter("newscrawler_errors_total", "Errors by component and exception type", ["component", "type"])
+LLM_CALLS = Counter("newscrawler_llm_calls_total", "Routed chat model calls by tier, route and outcome",
+                    ["tier", "route", "result"])
+
+_current_span: ContextVar = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation. Use as a context manager, or call ``end()`` for callback-style timing."""
+
+    def __init__(self, kind: str, name: str, parent: "Span | None" = None):
+        self.kind, self.name = kind, name
+        self.parent = parent if parent is not None else _current_span.get()
+        self.trace_id = self.parent.trace_id if self.parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.start = time.perf_counter()
+        self._token = None
+
+    def end(self, error: BaseException | None = None) -> float:
+        elapsed = time.perf_counter() - self.start
+        SPAN_SECONDS.labels(self.kind, self.name).observe(elapsed)
+        status = "ok"
+        if error is not None:
+            status = type(error).__name__
+            ERRORS.labels(self.kind, status).inc()
+        logger.debug(
+            f"span {self.kind}:{self.name} {elapsed * 1000:.1f}ms status={status} "
+            f"trace={self.trace_id} span={self.span_id} parent={self.parent.span_id if self.parent else '-'}"
+        )
+        return elapsed
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        self.end(exc)
+
+
+def span(kind: str, name: str) -> Span:
+    """Time a block as a child of the current span: ``with metrics.span("agent_run", "chat"): ...``."""
+    return Span(kind, name)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def traced(kind: str):
+    """Decorator timing every call of a sync or async function as a span named after it.
+
+    ``functools.wraps`` keeps the signature visible to FastMCP's tool schema generation.
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with Span(kind, fn.__name__):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with Span(kind, fn.__name__):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count_error(component: str, error: BaseException):
+    ERRORS.labels(component, type(error).__name__).inc()
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text exposition format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,176 @@
+# pageCache.py
+"""Persistent on-disk cache of scraped pages.
+
+Entries are stored in a local SQLite file keyed by normalized URL and hold both
+the raw (zlib-compressed) response body, the extracted text and the page's image
+candidates. Fresh entries are
+served directly; stale ones are revalidated with ``If-None-Match`` /
+``If-Modified-Since`` so an unchanged page costs a 304 instead of a download.
+Least-recently-used entries are evicted to keep the file under a byte limit.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+# --- CONFIG ---
+CACHE_PATH = os.getenv("PAGE_CACHE_PATH", ".cache/pages.sqlite3")
+CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "3600"))  # seconds
+CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lowercase scheme/host, no default port, fragment or tracking params, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+@dataclass
+class CachedPage:
+    url: str
+    status: int
+    etag: str | None
+    last_modified: str | None
+    body: bytes
+    text: str
+    fetched_at: float
+    images: list[str] = field(default_factory=list)
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def validators(self) -> dict:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                text TEXT,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL,
+                images TEXT
+            )"""
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}
+        if "images" not in columns:  # caches created before image candidates were stored
+            self._db.execute("ALTER TABLE pages ADD COLUMN images TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages (accessed_at)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def get(self, url: str) -> CachedPage | None:
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, etag, last_modified, body, text, fetched_at, images FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), key))
+            self._db.commit()
+        status, etag, last_modified, body, text, fetched_at, images = row
+        return CachedPage(key, status, etag, last_modified, zlib.decompress(body), text, fetched_at,
+                          json.loads(images or "[]"))
+
+    def put(self, url: str, status: int, headers, body: bytes, text: str, images: list[str] = ()):
+        """Store a fetched page. ``headers`` is any mapping of response headers."""
+        if "no-store" in headers.get("cache-control", ""):
+            return
+        key = normalize_url(url)
+        compressed = zlib.compress(body)
+        images = json.dumps(list(images))
+        size = len(compressed) + len(text.encode()) + len(images)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, status, etag, last_modified, body, text, size, fetched_at, "
+                "accessed_at, images) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, headers.get("etag"), headers.get("last-modified"), compressed, text, size, now, now,
+                 images),
+            )
+            self._evict()
+            self._db.commit()
+
+    def mark_revalidated(self, url: str):
+        """Record a 304 Not Modified: the cached copy is fresh again."""
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), normalize_url(url)))
+            self._db.commit()
+        self.revalidations += 1
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM pages WHERE url = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+        logger.info(f"Page cache evicted down to {total} bytes")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+        }
+
+
+_cache = None
+
+
+def get_cache() -> PageCache:
+    """Return the process-wide page cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = PageCache()
+    return _cache
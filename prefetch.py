@@ -0,0 +1,146 @@
+# prefetch.py
+"""Speculative prefetch of pages the agent is likely to scrape next.
+
+After a search, the top result URLs are fetched in the background into a short-lived
+in-memory cache. A later scrape of one of them takes the finished page immediately,
+or joins the fetch still in flight, instead of starting its own. Prefetching is
+bounded by a concurrency limit and by the bytes of text held; entries nobody claims
+within the TTL are dropped and counted as wasted, so ``stats()`` shows whether the
+speculation pays off.
+"""
+import asyncio
+import contextvars
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+import deadline
+import metrics
+from pageCache import normalize_url
+
+# --- CONFIG ---
+ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+TOP_N = int(os.getenv("PREFETCH_TOP_N", "3"))  # results prefetched per search
+MAX_CONCURRENCY = int(os.getenv("PREFETCH_MAX_CONCURRENCY", "4"))
+MAX_BYTES = int(os.getenv("PREFETCH_MAX_BYTES", str(8 * 1024 * 1024)))  # text held for unclaimed pages
+TTL = float(os.getenv("PREFETCH_TTL", "120"))  # seconds an unclaimed page is kept
+
+
+@dataclass
+class _Entry:
+    task: asyncio.Task
+    created: float
+    size: int = 0
+
+
+class Prefetcher:
+    """Background fetches keyed by normalized URL, claimed at most once.
+
+    ``fetch(url)`` returns ``(text, images)``; text starting with "Error" marks a failure.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[tuple[str, list[str]]]], max_concurrency: int = MAX_CONCURRENCY,
+                 max_bytes: int = MAX_BYTES, ttl: float = TTL):
+        self.fetch = fetch
+        self.max_concurrency = max_concurrency
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._slots = None
+        self._bytes = 0
+        self.counts = {"scheduled": 0, "used": 0, "joined": 0, "wasted": 0, "skipped": 0, "failed": 0}
+
+    def _count(self, result: str):
+        self.counts[result] += 1
+        metrics.PREFETCH.labels(result).inc()
+
+    def schedule(self, urls: list[str]) -> int:
+        """Start background fetches for ``urls`` not already prefetched. Returns how many were started."""
+        self._sweep()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        started = 0
+        for url in urls:
+            key = normalize_url(url)
+            if key in self._entries:
+                continue
+            if self._bytes >= self.max_bytes:
+                self._count("skipped")
+                continue
+            # A fresh context: the prefetch must not inherit the search call's deadline or trace
+            task = asyncio.create_task(self._run(url), context=contextvars.Context())
+            entry = _Entry(task, time.monotonic())
+            task.add_done_callback(lambda t, key=key, entry=entry: self._finished(key, entry))
+            self._entries[key] = entry
+            self._count("scheduled")
+            started += 1
+        return started
+
+    async def _run(self, url: str) -> tuple[str, list[str]]:
+        async with self._slots:
+            with metrics.span("prefetch", "page"):
+                return await self.fetch(url)
+
+    def _finished(self, key: str, entry: _Entry):
+        if self._entries.get(key) is not entry:
+            return  # already claimed
+        if entry.task.cancelled() or entry.task.exception() is not None or entry.task.result()[0].startswith("Error"):
+            self._entries.pop(key)
+            self._count("failed")
+            return
+        entry.size = len(entry.task.result()[0].encode())
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            oldest = next((k for k, e in self._entries.items() if e.task.done()), None)
+            if oldest is None:
+                break
+            self._drop(oldest)
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._count("wasted")
+
+    def _sweep(self):
+        """Drop finished entries nobody claimed within the TTL."""
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if entry.task.done() and now - entry.created > self.ttl:
+                self._drop(key)
+
+    async def take(self, url: str) -> tuple[str, list[str]] | None:
+        """``(text, images)`` prefetched for ``url``, waiting for an in-flight fetch within the current deadline.
+
+        Returns None when there is nothing usable, so the caller fetches the page itself.
+        """
+        self._sweep()
+        entry = self._entries.pop(normalize_url(url), None)
+        if entry is None:
+            return None
+        self._bytes -= entry.size
+        in_flight = not entry.task.done()
+        try:
+            async with asyncio.timeout(deadline.remaining()):
+                page = await asyncio.shield(entry.task)
+        except Exception:
+            self._count("failed")
+            return None
+        if page[0].startswith("Error"):
+            self._count("failed")
+            return None
+        self._count("joined" if in_flight else "used")
+        logger.info(f"Served {url} from prefetch ({'joined in-flight fetch' if in_flight else 'ready'})")
+        return page
+
+    def stats(self) -> dict:
+        return {
+            **self.counts,
+            "pending": sum(1 for e in self._entries.values() if not e.task.done()),
+            "ready": sum(1 for e in self._entries.values() if e.task.done()),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
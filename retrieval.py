@@ -0,0 +1,238 @@
+# retrieval.py
+"""Local passage index over scraped and searched text.
+
+Text is split into overlapping chunks, embedded in batches with fastembed and
+appended to a memory-mapped float32 matrix on disk; chunk text and sources live in
+a SQLite sidecar. The index holds at most ``RETRIEVAL_MAX_PASSAGES`` chunks; past that,
+new chunks overwrite the oldest ones in place. ``retrieve`` scores a query against every stored vector with a
+single matrix-vector product and returns the top-k passages, so the agent can pull
+only the evidence it needs instead of whole pages.
+
+Indexing is opt-in (``RETRIEVAL_ENABLED=1``). Texts are queued and embedded one at a
+time by a single worker on the shared blocking pool; when ``RETRIEVAL_QUEUE_SIZE``
+texts are already waiting, new ones are skipped rather than piling up.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from blocking import run_blocking
+
+# --- CONFIG ---
+ENABLED = os.getenv("RETRIEVAL_ENABLED", "0") != "0"
+INDEX_DIR = os.getenv("RETRIEVAL_INDEX_DIR", ".cache/passages")
+MODEL_NAME = os.getenv("RETRIEVAL_MODEL", "BAAI/bge-small-en-v1.5")
+CHUNK_CHARS = int(os.getenv("RETRIEVAL_CHUNK_CHARS", "800"))
+MAX_PASSAGES = int(os.getenv("RETRIEVAL_MAX_PASSAGES", "200000"))  # ~300 MB of vectors at 384 dimensions
+QUEUE_SIZE = int(os.getenv("RETRIEVAL_QUEUE_SIZE", "32"))  # texts waiting to be indexed
+CHUNK_OVERLAP = 100
+BATCH_SIZE = 64
+
+_model = None
+_model_lock = threading.Lock()
+_index = None
+_queue = None  # (loop, queue, worker task) of the running event loop
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """Pack paragraphs into chunks of at most ``max_chars``, splitting oversized paragraphs with overlap."""
+    chunks, current = [], ""
+    for paragraph in (p.strip() for p in text.split("\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars - overlap:]
+        if current and len(current) + len(paragraph) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            from fastembed import TextEmbedding
+            logger.info(f"Loading embedding model {MODEL_NAME}")
+            _model = TextEmbedding(model_name=MODEL_NAME)
+    return _model
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed_passages(texts: list[str]) -> np.ndarray:
+    return _normalize(np.stack(list(get_model().embed(texts, batch_size=BATCH_SIZE))))
+
+
+def embed_query(query: str) -> np.ndarray:
+    return _normalize(next(iter(get_model().query_embed(query))))
+
+
+class PassageIndex:
+    def __init__(self, directory: str = INDEX_DIR, model_name: str = MODEL_NAME, max_passages: int = MAX_PASSAGES):
+        self.max_passages = max_passages
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.dir / "passages.sqlite3", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS passages (id INTEGER PRIMARY KEY, source TEXT, text TEXT, digest TEXT UNIQUE)"
+        )
+        stored = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        if stored.get("model", model_name) != model_name:
+            logger.info(f"Embedding model changed to {model_name}; resetting passage index")
+            self._db.execute("DELETE FROM passages")
+            self._db.execute("DELETE FROM meta")
+            (self.dir / "vectors.f32").unlink(missing_ok=True)
+            stored = {}
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('model', ?)", (model_name,))
+        self._db.commit()
+        self.dim = int(stored["dim"]) if "dim" in stored else None
+        self.size = min(self._db.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM passages").fetchone()[0],
+                        max_passages)
+        self.next = int(stored.get("next", self.size)) % max_passages  # slot the next chunk is written to
+        self._vectors = None
+        self._lock = threading.Lock()
+        if self.dim is not None and self.size:
+            self._map(self.size)
+
+    def _map(self, rows: int):
+        """(Re)map the vector file with room for at least ``rows`` vectors, doubling capacity as it grows."""
+        path = self.dir / "vectors.f32"
+        row_bytes = self.dim * 4
+        capacity = max(path.stat().st_size // row_bytes if path.exists() else 0, 1024)
+        while capacity < rows:
+            capacity *= 2
+        if not path.exists() or path.stat().st_size < capacity * row_bytes:
+            with open(path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _known(self, digests) -> set[str]:
+        return {
+            row[0] for row in self._db.execute(
+                f"SELECT digest FROM passages WHERE digest IN ({','.join('?' * len(digests))})", list(digests)
+            )
+        }
+
+    def add(self, source: str, text: str) -> int:
+        """Chunk, embed and append ``text``; chunks already in the index are skipped. Returns chunks added."""
+        chunks = {hashlib.sha1(c.encode()).hexdigest(): c for c in chunk_text(text)}
+        if not chunks:
+            return 0
+        with self._lock:
+            known = self._known(chunks)
+        new = [(digest, chunk) for digest, chunk in chunks.items() if digest not in known][-self.max_passages:]
+        if not new:
+            return 0
+        vectors = embed_passages([chunk for _, chunk in new])
+        with self._lock:
+            # A concurrent add of the same page may have stored some of these while we embedded
+            known = self._known([digest for digest, _ in new])
+            keep = [i for i, (digest, _) in enumerate(new) if digest not in known]
+            if not keep:
+                return 0
+            new, vectors = [new[i] for i in keep], vectors[keep]
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(self.dim),))
+            slots = [(self.next + i) % self.max_passages for i in range(len(new))]
+            self._map(min(self.size + len(new), self.max_passages))
+            self._vectors[slots] = vectors
+            self._vectors.flush()
+            # Slots past the cap held the oldest passages; replace them
+            self._db.executemany("DELETE FROM passages WHERE id = ?", [(slot,) for slot in slots])
+            self._db.executemany(
+                "INSERT INTO passages VALUES (?, ?, ?, ?)",
+                [(slot, source, chunk, digest) for slot, (digest, chunk) in zip(slots, new)],
+            )
+            self.next = (self.next + len(new)) % self.max_passages
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('next', ?)", (str(self.next),))
+            self._db.commit()
+            self.size = min(self.size + len(new), self.max_passages)
+        logger.info(f"Indexed {len(new)} passages from {source}")
+        return len(new)
+
+    def search(self, query: str, k: int = 5) -> list[dict]:
+        if not self.size:
+            return []
+        q = embed_query(query)
+        with self._lock:
+            scores = self._vectors[:self.size] @ q
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        with self._lock:
+            rows = {
+                row[0]: row[1:] for row in self._db.execute(
+                    f"SELECT id, source, text FROM passages WHERE id IN ({','.join('?' * k)})", [int(i) for i in top]
+                )
+            }
+        return [
+            {"source": rows[int(i)][0], "score": round(float(scores[i]), 4), "text": rows[int(i)][1]}
+            for i in top if int(i) in rows
+        ]
+
+
+def get_index() -> PassageIndex:
+    global _index
+    if _index is None:
+        _index = PassageIndex()
+    return _index
+
+
+async def _index_worker(queue: asyncio.Queue):
+    index = get_index()
+    while True:
+        source, text = await queue.get()
+        try:
+            await run_blocking(index.add, source, text)
+        except Exception as e:
+            logger.warning(f"Indexing {source} failed: {e}")
+        finally:
+            queue.task_done()
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    loop = asyncio.get_running_loop()
+    if _queue is None or _queue[0] is not loop:
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        _queue = (loop, queue, loop.create_task(_index_worker(queue)))
+    return _queue[1]
+
+
+def index_later(source: str, text: str):
+    """Queue ``text`` for background indexing so the calling tool can return immediately."""
+    if not ENABLED or not text or text.startswith("Error:"):
+        return
+    try:
+        _get_queue().put_nowait((source, text))
+    except asyncio.QueueFull:
+        logger.warning(f"Indexing queue full, skipping {source}")
+
+
+async def retrieve(query: str, k: int = 5) -> list[dict]:
+    """Top-k passages for ``query`` once any queued indexing has finished."""
+    if _queue is not None and _queue[0] is asyncio.get_running_loop():
+        await _queue[1].join()
+    index = get_index()
+    return await asyncio.to_thread(index.search, query, k)
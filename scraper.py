@@ -0,0 +1,132 @@
+# scraper.py
+"""Webpage scraping shared by the stdio and SSE MCP servers."""
+import asyncio
+import time
+from urllib.parse import urljoin
+
+import httpx
+from loguru import logger
+
+from blocking import run_blocking
+import dedup
+import fetcher
+import htmlExtract
+import imageProbe
+import metrics
+import prefetch
+import retrieval
+from pageCache import get_cache
+
+DUPLICATE_NOTE = "Note: this page nearly duplicates"
+
+
+def _feed(extractor: htmlExtract.ParagraphExtractor, chunk: bytes) -> float:
+    """Feed one chunk to the extractor, returning the seconds spent parsing it."""
+    start = time.perf_counter()
+    extractor.feed_bytes(chunk)
+    return time.perf_counter() - start
+
+
+async def _download(url: str, headers: dict | None):
+    """Stream a page through the extractor, stopping at the byte or character budget.
+
+    Returns ``(response, body, text, images)``; ``text`` is None for a 304. ``images``
+    are the page's image candidates as absolute http(s) URLs.
+    """
+    async with fetcher.stream(url, headers=headers) as response:
+        if response.status_code == 304:
+            return response, b"", None, []
+        extractor = htmlExtract.ParagraphExtractor(response.charset_encoding)
+        body = bytearray()
+        parse_seconds = 0.0
+        async for chunk in response.aiter_bytes(htmlExtract.CHUNK_SIZE):
+            chunk = chunk[:htmlExtract.MAX_BYTES - len(body)]
+            body += chunk
+            metrics.FETCH_BYTES.inc(len(chunk))
+            parse_seconds += await run_blocking(_feed, extractor, chunk)
+            if extractor.done or len(body) >= htmlExtract.MAX_BYTES:
+                logger.info(f"Stopped reading {url} at {len(body)} bytes (extraction budget reached)")
+                break
+        metrics.PARSE_SECONDS.observe(parse_seconds)
+        text = await run_blocking(extractor.text)
+        base = str(response.url)
+        images = [urljoin(base, src) for src in extractor.images]
+        return response, bytes(body), text, [src for src in images if src.startswith(("http://", "https://"))]
+
+
+async def scrape(url: str, images: bool = True) -> str:
+    """Scrape visible paragraph text from a webpage URL.
+
+    Pages whose text nearly duplicates one seen under another URL (possibly by another session)
+    keep their text, with a note naming that URL.
+    With ``images``, the page's usable images (probed for type and size) are listed after the text.
+    """
+    page = await prefetcher.take(url)
+    text, candidates = page if page is not None else await _scrape_page(url)
+    original = await run_blocking(dedup.check_page, url, text)
+    if original is not None:
+        text = f"{DUPLICATE_NOTE} {original}.\n\n{text}"
+    if images and not text.startswith("Error"):
+        listing = imageProbe.describe(await imageProbe.probe_many(candidates))
+        if listing:
+            text = f"{text}\n\n{listing}"
+    return text
+
+
+async def _scrape_page(url: str) -> tuple[str, list[str]]:
+    """Scrape paragraph text and image candidates through the page cache.
+
+    The images come straight from the download, so pages the cache does not keep
+    (``no-store``, errors) still list them.
+    """
+    cache = get_cache()
+    cached = await run_blocking(cache.get, url)
+    if cached is not None and cached.is_fresh(cache.ttl):
+        cache.hits += 1
+        metrics.CACHE_LOOKUPS.labels("pages", "hit").inc()
+        return cached.text, cached.images
+    try:
+        response, body, text, images = await _download(url, cached.validators() if cached else None)
+        if text is None and cached is not None:
+            await run_blocking(cache.mark_revalidated, url)
+            metrics.CACHE_LOOKUPS.labels("pages", "revalidated").inc()
+            return cached.text, cached.images
+        cache.misses += 1
+        metrics.CACHE_LOOKUPS.labels("pages", "miss").inc()
+        if response.is_success:
+            await run_blocking(cache.put, url, response.status_code, response.headers, body, text, images)
+            retrieval.index_later(url, text)
+        return text or "", images
+    except (TimeoutError, httpx.TimeoutException) as e:
+        metrics.count_error("scraper", e)
+        return f"Error: timed out fetching {url}", []
+    except Exception as e:
+        metrics.count_error("scraper", e)
+        return f"Error: {str(e)}", []
+
+
+prefetcher = prefetch.Prefetcher(_scrape_page)
+
+
+def prefetch_pages(urls: list[str]) -> int:
+    """Start fetching the first ``prefetch.TOP_N`` of ``urls`` in the background for a likely scrape."""
+    if not prefetch.ENABLED:
+        return 0
+    return prefetcher.schedule(urls[:prefetch.TOP_N])
+
+
+async def scrape_many(urls: list[str]) -> list[str]:
+    """Scrape several URLs concurrently, returning texts in input order.
+
+    Repeated URLs are fetched only once, and a page nearly duplicating an earlier page of
+    the same batch comes back as a short stub, since the caller gets that page's text too.
+    """
+    unique = list(dict.fromkeys(urls))
+    texts = await asyncio.gather(*(scrape(url) for url in unique))
+    bodies = [text.partition("\n\n")[2] if text.startswith(DUPLICATE_NOTE) else text for text in texts]
+    originals = await run_blocking(dedup.earlier_duplicates, bodies)
+    texts = [text if original is None else
+             f"Duplicate of {unique[original]}: this page repeats the content of that page above."
+             for text, original in zip(texts, originals)]
+    by_url = dict(zip(unique, texts))
+    return [by_url[url] for url in urls]
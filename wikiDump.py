@@ -0,0 +1,330 @@
+# wikiDump.py
+"""Wikipedia articles from a local multistream dump, with the online API as fallback.
+
+A ``pages-articles-multistream.xml.bz2`` dump is a series of independent bz2 streams
+of about 100 pages each; its companion ``multistream-index.txt(.bz2)`` lists
+``offset:page_id:title`` for every page. The index is compiled once into sorted
+64-bit title hashes and offsets that are memory-mapped, so a lookup is a binary
+search over the mapped array plus decompressing the one stream holding the page,
+instead of a network round trip. Recently decoded streams are kept in a small LRU.
+
+The compiled index is built from the command line (it takes a few minutes for a
+full dump), never inside a tool call; until it exists and matches the configured
+index file, lookups go to the online API::
+
+    python wikiDump.py --dump enwiki-...-multistream.xml.bz2 --index enwiki-...-multistream-index.txt.bz2
+
+The online fallback queries the MediaWiki API through ``fetcher``, so it is bounded
+by the tool's deadline and the host's circuit breaker like every other fetch.
+"""
+import asyncio
+import bz2
+import hashlib
+import html
+import json
+import mmap
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+import numpy as np
+from loguru import logger
+
+from blocking import run_blocking
+import deadline
+import fetcher
+
+# --- CONFIG ---
+DUMP_PATH = os.getenv("WIKI_DUMP_PATH", "")  # *-pages-articles-multistream.xml.bz2
+INDEX_PATH = os.getenv("WIKI_INDEX_PATH", "")  # *-pages-articles-multistream-index.txt(.bz2)
+INDEX_DIR = os.getenv("WIKI_INDEX_DIR", ".cache/wiki")  # compiled, memory-mapped index
+ONLINE_FALLBACK = os.getenv("WIKI_ONLINE_FALLBACK", "1") == "1"
+BASE_URL = os.getenv("WIKI_BASE_URL", "https://en.wikipedia.org/wiki/")
+API_URL = os.getenv("WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+STREAM_CACHE_SIZE = int(os.getenv("WIKI_STREAM_CACHE_SIZE", "16"))  # decoded streams kept in memory
+MAX_REDIRECTS = 2
+READ_CHUNK = 256 * 1024
+SEARCH_RESULTS = 3  # search hits tried when the topic is not an article title
+
+_PAGE_PARAMS = {
+    "action": "query", "format": "json", "formatversion": "2", "redirects": "1",
+    "prop": "extracts|info|pageprops", "explaintext": "1", "exsectionformat": "plain",
+    "inprop": "url", "ppprop": "disambiguation",
+}
+
+_PAGE = re.compile(rb"<page>.*?</page>", re.S)
+
+
+def normalize_title(title: str) -> str:
+    """Lookup key: underscores as spaces, collapsed whitespace, case-folded."""
+    return " ".join(title.replace("_", " ").split()).casefold()
+
+
+def title_key(title: str) -> int:
+    return int.from_bytes(hashlib.blake2b(normalize_title(title).encode(), digest_size=8).digest(), "little")
+
+
+def page_url(title: str) -> str:
+    return BASE_URL + quote(title.replace(" ", "_"))
+
+
+def _innermost(pattern: str, text: str, repl: str = "", flags: int = 0) -> str:
+    """Apply a substitution until nothing matches (for nested ``{{...}}`` and ``{|...|}``)."""
+    regex = re.compile(pattern, flags)
+    while True:
+        text, count = regex.subn(repl, text)
+        if not count:
+            return text
+
+
+def plain_text(wikitext: str) -> str:
+    """Readable text from wikitext: templates, tables, references, files and markup removed."""
+    text = re.sub(r"<!--.*?-->", "", wikitext, flags=re.S)
+    text = re.sub(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", "", text, flags=re.S | re.I)
+    text = _innermost(r"\{\{[^{}]*\}\}", text)
+    text = _innermost(r"\{\|(?:(?!\{\|).)*?\|\}", text, flags=re.S)
+    text = _innermost(r"\[\[(?:File|Image|Category):[^\[\]]*\]\]", text, flags=re.I)
+    text = re.sub(r"\[\[(?:[^\[\]|]*\|)?([^\[\]]*)\]\]", r"\1", text)
+    text = re.sub(r"\[https?://\S+ ([^\]]*)\]", r"\1", text)
+    text = re.sub(r"\[https?://\S+\]", "", text)
+    text = re.sub(r"'{2,}", "", text)
+    text = re.sub(r"^=+\s*(.*?)\s*=+\s*$", r"\1", text, flags=re.M)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = html.unescape(text)
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith(("|", "!")):  # leftovers of malformed tables
+            continue
+        lines.append(line.lstrip("*#:; "))
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def summary_of(text: str, max_paragraphs: int = 2) -> str:
+    """The lead: the first paragraphs before the first section heading."""
+    paragraphs = [p for p in text.split("\n\n") if p.strip()]
+    return "\n\n".join(paragraphs[:max_paragraphs])
+
+
+def _read_index_lines(path: str):
+    opener = bz2.open if path.endswith(".bz2") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            offset, _, title = line.rstrip("\n").split(":", 2)
+            yield int(offset), title
+
+
+def build_index(index_path: str, out_dir: str = INDEX_DIR) -> int:
+    """Compile a multistream index into sorted title hashes, stream offsets and title positions."""
+    start = time.perf_counter()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    # Compact machine-word arrays: a full English index has over 20 million titles
+    keys, offsets, positions = array("Q"), array("Q"), array("Q")
+    position = 0
+    with open(out / "titles.txt.tmp", "wb") as titles:
+        for offset, title in _read_index_lines(index_path):
+            encoded = title.encode() + b"\n"
+            keys.append(title_key(title))
+            offsets.append(offset)
+            positions.append(position)
+            titles.write(encoded)
+            position += len(encoded)
+    keys = np.frombuffer(keys, dtype=np.uint64)
+    order = np.argsort(keys, kind="stable")
+    keys[order].tofile(out / "keys.u64")
+    np.frombuffer(offsets, dtype=np.uint64)[order].tofile(out / "offsets.u64")
+    np.frombuffer(positions, dtype=np.uint64)[order].tofile(out / "titles.u64")
+    os.replace(out / "titles.txt.tmp", out / "titles.txt")
+    source = Path(index_path).stat()
+    (out / "meta.json").write_text(json.dumps({
+        "index_path": str(Path(index_path).resolve()), "size": source.st_size, "mtime": source.st_mtime,
+        "entries": len(keys),
+    }))
+    logger.info(f"Compiled Wikipedia index of {len(keys)} titles in {time.perf_counter() - start:.1f}s")
+    return len(keys)
+
+
+def index_is_current(index_path: str, out_dir: str = INDEX_DIR) -> bool:
+    try:
+        meta = json.loads((Path(out_dir) / "meta.json").read_text())
+    except (OSError, ValueError):
+        return False
+    source = Path(index_path).stat()
+    return (meta["index_path"] == str(Path(index_path).resolve()) and meta["size"] == source.st_size
+            and meta["mtime"] == source.st_mtime)
+
+
+class WikiDump:
+    """Title lookups against a multistream dump through a memory-mapped compiled index."""
+
+    def __init__(self, dump_path: str, index_dir: str = INDEX_DIR, stream_cache_size: int = STREAM_CACHE_SIZE):
+        directory = Path(index_dir)
+        self.keys = np.memmap(directory / "keys.u64", dtype=np.uint64, mode="r")
+        self.offsets = np.memmap(directory / "offsets.u64", dtype=np.uint64, mode="r")
+        self.positions = np.memmap(directory / "titles.u64", dtype=np.uint64, mode="r")
+        self._titles_file = open(directory / "titles.txt", "rb")
+        self.titles = mmap.mmap(self._titles_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._dump_file = open(dump_path, "rb")
+        self.dump = mmap.mmap(self._dump_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.stream_cache_size = stream_cache_size
+        self._streams: OrderedDict[int, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _title_at(self, position: int) -> str:
+        end = self.titles.find(b"\n", position)
+        return self.titles[position:end].decode()
+
+    def locate(self, title: str) -> tuple[str, int] | None:
+        """``(exact title, stream offset)`` for a title, preferring an exact-case match."""
+        key = np.uint64(title_key(title))
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        hi = int(np.searchsorted(self.keys, key, side="right"))
+        wanted = normalize_title(title)
+        found = None
+        for i in range(lo, hi):
+            candidate = self._title_at(int(self.positions[i]))
+            if candidate == title:
+                return candidate, int(self.offsets[i])
+            if found is None and normalize_title(candidate) == wanted:
+                found = candidate, int(self.offsets[i])
+        return found
+
+    def _stream(self, offset: int) -> dict:
+        """Pages of the bz2 stream at ``offset`` as ``{title: (wikitext, redirect)}``, via the LRU."""
+        with self._lock:
+            if offset in self._streams:
+                self._streams.move_to_end(offset)
+                return self._streams[offset]
+        decompressor = bz2.BZ2Decompressor()
+        parts, position = [], offset
+        while not decompressor.eof and position < len(self.dump):
+            parts.append(decompressor.decompress(self.dump[position:position + READ_CHUNK]))
+            position += READ_CHUNK
+        pages = {}
+        for match in _PAGE.finditer(b"".join(parts)):
+            page = ET.fromstring(match.group())
+            redirect = page.find("redirect")
+            pages[page.findtext("title")] = (
+                page.findtext("revision/text") or "",
+                redirect.get("title") if redirect is not None else None,
+            )
+        with self._lock:
+            self._streams[offset] = pages
+            while len(self._streams) > self.stream_cache_size:
+                self._streams.popitem(last=False)
+        return pages
+
+    def lookup(self, title: str) -> dict | None:
+        """Title, URL, lead summary and plain text of an article, following redirects."""
+        for _ in range(MAX_REDIRECTS + 1):
+            located = self.locate(title)
+            if located is None:
+                return None
+            exact, offset = located
+            wikitext, redirect = self._stream(offset).get(exact, ("", None))
+            if redirect is None:
+                text = plain_text(wikitext)
+                return {"title": exact, "url": page_url(exact), "summary": summary_of(text), "content": text}
+            title = redirect
+        return None
+
+    def close(self):
+        self.titles.close()
+        self.dump.close()
+        self._titles_file.close()
+        self._dump_file.close()
+
+
+_dump = None
+_dump_lock = threading.Lock()
+_warned = False
+
+
+def get_dump() -> WikiDump | None:
+    """The configured dump, or None when none is configured or its index has not been compiled."""
+    global _dump, _warned
+    with _dump_lock:
+        if _dump is None and DUMP_PATH and INDEX_PATH:
+            if not index_is_current(INDEX_PATH):
+                if not _warned:
+                    logger.warning(f"Wikipedia index in {INDEX_DIR} is missing or stale; using the online API "
+                                   f"until it is compiled with: python wikiDump.py --index {INDEX_PATH}")
+                    _warned = True
+                return None
+            _dump = WikiDump(DUMP_PATH)
+    return _dump
+
+
+def lookup_dump(topic: str) -> dict | None:
+    """Look ``topic`` up in the local dump. Blocking; run in a worker thread."""
+    dump = get_dump()
+    return dump.lookup(topic) if dump is not None else None
+
+
+async def _api(params: dict) -> dict:
+    response = await fetcher.fetch(f"{API_URL}?{urlencode(params)}")
+    response.raise_for_status()
+    return response.json()
+
+
+async def _online_page(title: str) -> dict | None:
+    """The article titled ``title``, following redirects; None if missing or a disambiguation page."""
+    pages = (await _api({**_PAGE_PARAMS, "titles": title})).get("query", {}).get("pages", [])
+    if not pages or pages[0].get("missing") or "disambiguation" in pages[0].get("pageprops", {}):
+        return None
+    page = pages[0]
+    text = page.get("extract", "")
+    return {"title": page["title"], "url": page.get("fullurl") or page_url(page["title"]),
+            "summary": summary_of(text), "content": text}
+
+
+async def lookup_online(topic: str) -> dict | None:
+    """The same fields from the live MediaWiki API: the exact title, else the top search hits."""
+    article = await _online_page(topic)
+    if article is not None:
+        return article
+    search = {"action": "query", "format": "json", "formatversion": "2", "list": "search",
+              "srsearch": topic, "srlimit": str(SEARCH_RESULTS)}
+    for hit in (await _api(search)).get("query", {}).get("search", []):
+        if hit["title"] != topic:
+            article = await _online_page(hit["title"])
+            if article is not None:
+                return article
+    return None
+
+
+async def article(topic: str) -> dict | None:
+    """Look ``topic`` up in the local dump, then online if that is allowed, bounded by the current deadline."""
+    async with asyncio.timeout(deadline.remaining()):
+        found = await run_blocking(lookup_dump, topic)
+        if found is not None:
+            return {**found, "source": "dump"}
+        if ONLINE_FALLBACK:
+            found = await lookup_online(topic)
+            if found is not None:
+                return {**found, "source": "online"}
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile a multistream index and look titles up.")
+    parser.add_argument("--dump", default=DUMP_PATH)
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--out", default=INDEX_DIR)
+    parser.add_argument("titles", nargs="*", help="titles to look up after compiling")
+    args = parser.parse_args()
+    build_index(args.index, args.out)
+    dump = WikiDump(args.dump, args.out)
+    for name in args.titles:
+        article = dump.lookup(name)
+        print(json.dumps({"title": name, "found": article["title"] if article else None,
+                          "summary": article["summary"][:300] if article else None}))